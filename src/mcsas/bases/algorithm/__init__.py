@@ -2,7 +2,9 @@
 # bases/algorithm/__init__.py
 
 from .algorithmbase import AlgorithmBase
-from .numbergenerator import NumberGenerator, RandomUniform, RandomExponential
+from .numbergenerator import (NumberGenerator, RandomUniform,
+                              RandomExponential, randomGenerator,
+                              seedRandomGenerator)
 from .parameter import (ParameterBase, ParameterFloat, ParameterNumerical,
                        ParameterBoolean, ParameterLog, ParameterNameError,
                        ParameterString)
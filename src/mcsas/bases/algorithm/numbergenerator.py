@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 # bases/algorithm/numbergenerator.py
 
+import logging
 from abc import ABCMeta, abstractmethod
 from future.utils import with_metaclass
 import numpy
@@ -11,6 +12,19 @@ from ...utils import classname
 # the current implementation (types/classes only)
 # instances could be constructed with parameters, eg for randomExp or const
 
+# one generator (PCG64) for all draws, faster than the legacy global state
+_generator = numpy.random.default_rng()
+
+def randomGenerator():
+    """Returns the numpy random number generator used for all draws."""
+    return _generator
+
+def seedRandomGenerator(seed = None):
+    """Restarts the random number generator from *seed* for reproducible
+    results or from fresh entropy if it is None."""
+    global _generator
+    _generator = numpy.random.default_rng(seed)
+
 class NumberGenerator(with_metaclass(ABCMeta, object)):
     """Base class for number generators.
     Generates numbers in the interval [0, 1].
@@ -28,13 +42,28 @@ class NumberGenerator(with_metaclass(ABCMeta, object)):
 class RandomUniform(NumberGenerator):
     @classmethod
     def get(cls, count = 1):
-        return numpy.random.uniform(size = count)
-
-import sys
-
-# numpy.left|right_shift does not work for uint64 out of the box
-lshift = lambda x,s: numpy.uint64(x) * numpy.uint64(2**s)
-rshift = lambda x,s: numpy.uint64(x) / numpy.uint64(2**s)
+        return randomGenerator().random(count)
+
+_mask64 = (1 << 64) - 1 # keeps python integers within 64bit
+
+def _xorShift1024Star(state, p, count):
+    """Advances the xorshift1024* *state* of 16 uint64 in place by *count*
+    steps beginning at index *p*. Works on native python integers which
+    is much faster than arithmetic on boxed numpy.uint64 scalars.
+    Returns the generated uint64 numbers and the new index."""
+    s = [int(v) for v in state]
+    res = [0] * count
+    for i in range(count):
+        s0 = s[p]
+        p = (p + 1) & 15
+        s1 = s[p]
+        s1 ^= (s1 << 31) & _mask64 # a
+        s1 ^= s1 >> 11 # b
+        s0 ^= s0 >> 30 # c
+        s[p] = s0 ^ s1
+        res[i] = (s[p] * 1181783497276652981) & _mask64 # star8/M_8
+    state[:] = s
+    return numpy.array(res, dtype = numpy.uint64), p
 
 class RandomXorShiftUniform(NumberGenerator):
     """Implemented according to xorshift1024* at http://xorshift.di.unimi.it
@@ -48,6 +77,7 @@ class RandomXorShiftUniform(NumberGenerator):
     """
     _dtype = numpy.dtype(numpy.uint64)
     _count = 16
+    _scale = ( 1./4 ) / ( 1 << 62 ) # maps uint64 to [0, 1)
     s = None
     p = None
 
@@ -57,17 +87,10 @@ class RandomXorShiftUniform(NumberGenerator):
 
     @classmethod
     def getSeed(cls):
-        """Generate seed using numpy."""
-        def rand32():
-            return numpy.random.random_integers(
-                        numpy.iinfo(numpy.uint32).min,
-                        numpy.iinfo(numpy.uint32).max)
-        seedData = numpy.zeros(cls._count, dtype = cls._dtype) # init empty array
-        for i in range(cls._count): # for each 64bit uint
-            seedData[i] = (lshift(rand32(), 32)) + rand32()
-        # replacement:
-        # return numpy.random.rand(cls._count).view(numpy.uint64)
-        return seedData
+        """Generate seed using numpy, all 64bit words drawn at once."""
+        info = numpy.iinfo(cls._dtype)
+        return randomGenerator().integers(info.min, info.max, endpoint = True,
+                                          size = cls._count, dtype = cls._dtype)
 
     @classmethod
     def setSeed(cls, seedData = None):
@@ -78,31 +101,19 @@ class RandomXorShiftUniform(NumberGenerator):
         assert(seedData.dtype is cls._dtype)
         seedData = seedData.flatten()
         cls.s = seedData
-        cls.p = numpy.random.random_integers(cls._count) - 1
-        # print >>sys.__stderr__, "got seed:", cls.s
+        cls.p = int(randomGenerator().integers(cls._count))
+        # formatted only if debug messages are enabled
+        logging.debug("xorshift1024* seed: %s", cls.s)
 
     @classmethod
     def next(cls):
-        s0 = cls.s[ cls.p ]
-        cls.p = ( cls.p + 1 ) & 15
-        s1 = cls.s[ cls.p ]
-        s1 ^= lshift(s1, 31) # a
-        s1 ^= rshift(s1, 11) # b
-        s0 ^= rshift(s0, 30) # c
-        cls.s[ cls.p ] = s0 ^ s1
-        # print >>sys.__stderr__, "next", cls.s 
-        return numpy.uint64(cls.s[ cls.p ]) * numpy.uint64(1181783497276652981) # star8/M_8
+        res, cls.p = _xorShift1024Star(cls.s, cls.p, 1)
+        return res[0]
 
     @classmethod
     def get(cls, count = 1):
-        def getFloat():
-            return ( ( 1./4 ) / ( 1 << 62 ) ) * next(cls)
-        old_settings = numpy.seterr(all = 'ignore')
-        res = numpy.zeros(count)
-        for i in range(count):
-            res[i] = getFloat()
-        numpy.seterr(**old_settings)
-        return res
+        res, cls.p = _xorShift1024Star(cls.s, cls.p, count)
+        return cls._scale * res
 
 import unittest
 import struct
@@ -132,8 +143,6 @@ class RandomXorShiftUniformTest(unittest.TestCase):
         ARGS = (EXECPATH, 0, A, B, C) + tuple(SEED)
         ARGS = tuple((str(a) for a in ARGS))
 
-        # print >>sys.__stderr__, " ".join(ARGS)
-
         self._p = subprocess.Popen(ARGS,
                                    stdout = subprocess.PIPE,
                                    stderr = subprocess.PIPE)
@@ -167,11 +176,23 @@ RandomXorShiftUniformTest.generateTests()
 
 class RandomExponential(NumberGenerator):
     lower, upper = 0., 1.
+    _logBase = numpy.log(10.)
+
+    @classmethod
+    def norm(cls):
+        """Reciprocal of the exponential range, computed once for each
+        class because the decades are fixed."""
+        if '_norm' not in vars(cls):
+            cls._norm = 10**(cls.lower - cls.upper)
+        return cls._norm
 
     @classmethod
     def get(cls, count = 1):
-        rs = 10**(numpy.random.uniform(cls.lower, cls.upper, count))
-        rs = (rs - 1) / (10**(cls.upper - cls.lower))
+        rs = randomGenerator().uniform(cls.lower, cls.upper, count)
+        # 10**rs - 1 in place, without temporaries
+        rs *= cls._logBase
+        numpy.expm1(rs, out = rs)
+        rs *= cls.norm()
         return rs
 
 class RandomExponential1(RandomExponential):
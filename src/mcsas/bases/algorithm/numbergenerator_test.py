@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# bases/algorithm/numbergenerator_test.py
+
+import numpy
+from numpy.testing import assert_array_equal
+
+from .numbergenerator import _xorShift1024Star, RandomXorShiftUniform
+
+def directXorShift1024Star(state, p, count):
+    """Reference xorshift1024* recurrence on numpy.uint64, one step at a
+    time, as in http://xorshift.di.unimi.it"""
+    s = numpy.array(state, dtype = numpy.uint64)
+    res = numpy.zeros(count, dtype = numpy.uint64)
+    with numpy.errstate(over = 'ignore'):
+        for i in range(count):
+            s0 = s[p]
+            p = (p + 1) % 16
+            s1 = s[p]
+            s1 ^= s1 << numpy.uint64(31)
+            s1 ^= s1 >> numpy.uint64(11)
+            s0 ^= s0 >> numpy.uint64(30)
+            s[p] = s0 ^ s1
+            res[i] = s[p] * numpy.uint64(1181783497276652981)
+    return res, s, p
+
+def getSeed():
+    info = numpy.iinfo(numpy.uint64)
+    return numpy.random.RandomState(11).randint(
+            info.min, info.max, size = 16, dtype = numpy.uint64)
+
+def testXorShift1024Star():
+    seed = getSeed()
+    # beginning near the end of the state: the index wraps around
+    for p, count in ((14, 5), (15, 1), (0, 40)):
+        state = seed.copy()
+        res, newP = _xorShift1024Star(state, p, count)
+        resRef, stateRef, pRef = directXorShift1024Star(seed, p, count)
+        assert res.dtype == numpy.uint64
+        assert_array_equal(res, resRef)
+        assert_array_equal(state, stateRef)
+        assert newP == pRef
+
+def testRandomXorShiftUniform():
+    seed = getSeed()
+    RandomXorShiftUniform.setSeed(seed.copy())
+    RandomXorShiftUniform.p = 13
+    resRef, stateRef, pRef = directXorShift1024Star(seed, 13, 3 + 20)
+    for i in range(3):
+        assert RandomXorShiftUniform.next() == resRef[i]
+    values = RandomXorShiftUniform.get(20)
+    assert RandomXorShiftUniform.p == pRef
+    assert_array_equal(RandomXorShiftUniform.s, stateRef)
+    assert numpy.all((values >= 0.) & (values < 1.))
+    assert_array_equal(values, resRef[3:] / 2.**64)
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
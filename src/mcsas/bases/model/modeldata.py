@@ -58,7 +58,8 @@ class ModelData(object):
         """Returns the volume fraction based on the provided scaling factor to
         match this model data to the measured data. Assumes that the weights
         'self.wset' contain the scatterer volume squared."""
-        return (self.wset * scaling / self.vset).flatten()
+        # both sets are flat already, no need to copy the result again
+        return self.wset * scaling / self.vset
 
 class SASModelData(ModelData):
     pass
@@ -43,6 +43,23 @@ class SASModel(with_metaclass(ABCMeta, ScatteringModel)):
         """
         return self.volume()**(2 * self.compensationExponent)
 
+    def doSmear(self, data):
+        """Returns True if the intensity has to be smeared for the given
+        data set."""
+        if not self.canSmear: # cheapest test first, no config lookup
+            return False
+        smearing = data.config.smearing
+        return ((smearing is not None) and
+                smearing.doSmear() and # serves same purpose as first
+                # inputValid can be removed once more appropriate limits are
+                # set in GUI
+                smearing.inputValid())
+
+    def smearingWeights(self, data):
+        """Returns the weights integrating the squared form factor at the
+        smeared q values of *data* over the beam profile."""
+        return data.config.smearing.integrationWeights
+
     def calcIntensity(self, data, compensationExponent = None):
         r"""Returns the intensity *I*, the volume :math:`v_{abs}` and the
         intensity weights *w* for a single parameter contribution over all *q*:
@@ -53,11 +70,7 @@ class SASModel(with_metaclass(ABCMeta, ScatteringModel)):
         w = self._weight(compensationExponent = compensationExponent)
         s = self.surface()
 
-        if ((data.config.smearing is not None) and
-                self.canSmear and
-                data.config.smearing.doSmear() and # serves same purpose as first
-                data.config.smearing.inputValid()):
-            # inputValid can be removed once more appropriate limits are set in GUI
+        if self.doSmear(data):
 
             # TODO: fix after change from x0Fit to x0:
             locs = data.locs # [data.x0.validIndices] # apply xlimits
@@ -65,17 +78,18 @@ class SASModel(with_metaclass(ABCMeta, ScatteringModel)):
             # kansas = locs.shape
             # locs = locs.reshape((locs.size))
             ff = self._formfactor(locs) # .reshape(kansas)
-            qOffset, weightFunc = data.config.smearing.prepared
 #            import sys
 #            print >>sys.__stderr__, "prepared"
 #            print >>sys.__stderr__, unicode(data.config.smearing)
-            it = 2 * np.trapz(ff**2 * w * weightFunc,
-                    x = qOffset, axis = 1)
+            # integration as matrix-vector product,
+            # its weights combined with the intensity weight
+            it = (ff * ff).dot(self.smearingWeights(data) * w)
         else:
             # calculate their form factors
             ff = self._formfactor(data)
-            # a set of intensities
-            it = ff**2 * w
+            # a set of intensities, squared and weighted in place
+            it = ff * ff
+            it *= w
         return it, v, w, s
 
 # vim: set ts=4 sts=4 sw=4 tw=0:
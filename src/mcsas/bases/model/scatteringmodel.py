@@ -5,13 +5,17 @@ import os.path
 import logging
 from abc import ABCMeta, abstractmethod
 from future.utils import with_metaclass
-from numpy import arange, zeros, argmax, hstack
+from numpy import (arange, zeros, argmax, hstack, array, multiply,
+                   concatenate, ascontiguousarray)
 
 from ...utils import isList, mixedmethod, testfor, classname
-from ..algorithm import AlgorithmBase
+from ..algorithm import AlgorithmBase, RandomUniform, randomGenerator
 from ...utils.parameter import isActiveFitParam
 
 class ScatteringModel(with_metaclass(ABCMeta, AlgorithmBase)):
+    _uniformBounds = None # ranges, indices and bounds of uniform parameters
+    _batchBytes = 64 * 1024**2 # memory for intensities evaluated at once
+
     @abstractmethod
     def volume(self):
         """Calculates the volume of this model, taking compensationExponent
@@ -76,12 +80,53 @@ class ScatteringModel(with_metaclass(ABCMeta, AlgorithmBase)):
         """
         raise NotImplementedError
 
-    def calc(self, data, pset, compensationExponent = None):
+    def calcIntensities(self, data, columns, compensationExponent = None):
+        """Optional vectorized counterpart of calcIntensity() for many
+        contributions at once. *columns* contains one contiguous array of
+        values for each active parameter, they must not be modified.
+        Returns a tuple of the unweighted intensities, one row per
+        contribution, and the arrays of volumes, weights and surfaces.
+        Returns None by default, then calc() evaluates each contribution
+        separately.
+        """
+        return None
+
+    def calc(self, data, pset, compensationExponent = None,
+             intensities = None):
         """Calculates the total intensity and scatterer volume contributions
         using the current model.
         *pset* number columns equals the number of active parameters.
+        *intensities*: Optional array with one row per contribution, receives
+                       the intensity of each contribution if provided.
         Returns a ModelData object for a certain type of measurement.
         """
+        # one contiguous array per parameter for vectorized models,
+        # the rows of the transposed set, copied at once if necessary
+        columns = ascontiguousarray(pset.T)
+        # which are evaluated in batches of limited memory size
+        count = pset.shape[0]
+        batch = max(1, self._batchBytes // (8 * max(1, data.f.binnedData.size)))
+        cumInt, sets = None, []
+        for start in range(0, count, batch):
+            stop = min(start + batch, count)
+            result = self.calcIntensities(data,
+                                          [c[start:stop] for c in columns],
+                                          compensationExponent = compensationExponent)
+            if result is None:
+                break
+            unweighted, vset, wset, sset = result
+            if intensities is not None:
+                multiply(unweighted, wset.reshape((-1, 1)),
+                         out = intensities[start:stop])
+            # the weighted sum over all contributions in one product
+            partialInt = wset.dot(unweighted)
+            cumInt = partialInt if cumInt is None else cumInt + partialInt
+            sets.append((vset, wset, sset))
+        else:
+            if len(sets):
+                return self.getModelData(cumInt,
+                                *[concatenate(s) for s in zip(*sets)],
+                                numParams = pset.shape[1])
         # remember parameter values
         params = self.activeParams()
         oldValues = [p() for p in params] # this sucks. But we dont want to lose the user provided value
@@ -99,14 +144,21 @@ class ScatteringModel(with_metaclass(ABCMeta, AlgorithmBase)):
                           compensationExponent = compensationExponent)
             # a set of intensities
             cumInt += it
+            if intensities is not None:
+                intensities[i] = it.flatten()
         # restore previous parameter values
         for p, v in zip(params, oldValues):
             p.setValue(v)
-        return self.getModelData(cumInt, vset, wset, sset)
+        return self.getModelData(cumInt, vset, wset, sset,
+                                 numParams = pset.shape[1])
 
-    def getModelData(self, cumInt, vset, wset, sset):
-        return self.modelDataType()(cumInt.flatten(), vset, wset, sset,
-                                    self.activeParamCount())
+    def getModelData(self, cumInt, vset, wset, sset, numParams = None):
+        """*numParams*: Number of active parameters if known already,
+                        saves looking them up for each call."""
+        if numParams is None:
+            numParams = self.activeParamCount()
+        # model data flattens (copies) the arrays itself
+        return self.modelDataType()(cumInt, vset, wset, sset, numParams)
 
     @abstractmethod
     def modelDataType(self):
@@ -118,14 +170,37 @@ class ScatteringModel(with_metaclass(ABCMeta, AlgorithmBase)):
         """Generates a set of parameters for this model using the predefined
         Parameter.generator. Allows for different random number distributions.
         """
-        lst = zeros((count, self.activeParamCount()))
-        for idx, param in enumerate(self.activeParams()):
+        params = self.activeParams()
+        lst = zeros((count, len(params)))
+        # uniformly distributed parameters are drawn in a single call
+        uniform, lows, highs = self._uniformRanges(params)
+        if len(uniform):
+            lst[:, uniform] = randomGenerator().uniform(lows, highs,
+                                            size = (count, len(uniform)))
+        for idx, param in enumerate(params):
             # generate numbers in different range for each active parameter
-            if isActiveFitParam(param):
+            if idx not in uniform:
                 lst[:, idx] = param.generate(count = count)
         # output count-by-nParameters array
         return lst
 
+    def _uniformRanges(self, params):
+        """Returns the indices of the uniformly distributed parameters and
+        the arrays of their lower and upper bounds. They are kept until the
+        active range or the generator of a parameter is replaced."""
+        state = [(param, param.activeRange(), param.generator())
+                 for param in params]
+        cached = self._uniformBounds
+        if (cached is None or len(cached[0]) != len(state)
+                or any(a is not b for new, old in zip(state, cached[0])
+                                  for a, b in zip(new, old))):
+            uniform = [idx for idx, (param, dummy, generator)
+                       in enumerate(state) if generator is RandomUniform]
+            lows = array([min(state[idx][1]) for idx in uniform])
+            highs = array([max(state[idx][1]) for idx in uniform])
+            self._uniformBounds = cached = (state, uniform, lows, highs)
+        return cached[1:]
+
     def updateParamBounds(self, bounds):
         if not isList(bounds):
             bounds = [bounds,]
@@ -157,12 +232,13 @@ class ScatteringModel(with_metaclass(ABCMeta, AlgorithmBase)):
         """Update parameter values based on provided dict with parameter
         names as keys."""
         selforcls.fixTestParams(paramDict)
-        for key, value in paramDict.items():
-            try:
-                p = getattr(selforcls, key)
-            except: pass
-            else:
-                p.setValue(p.dtype(value))
+        # look up parameters by name once instead of probing each key
+        params = dict((p.name(), p) for p in selforcls.params())
+        for key, value in list(paramDict.items()):
+            p = params.get(key, None)
+            if p is None:
+                continue # not a parameter name, e.g. an index
+            p.setValue(p.dtype(value))
 
     @mixedmethod
     def fixTestParams(selforcls, params):
@@ -3,7 +3,7 @@
 
 import codecs
 from abc import ABCMeta, abstractmethod
-from numpy import array as np_array
+from numpy import array as np_array, ndarray
 from future.utils import with_metaclass
 
 from .datafile import DataFile
@@ -31,6 +31,14 @@ class AsciiFile(with_metaclass(ABCMeta, DataFile)):
 
     @classmethod
     def formatData(cls, data, **kwargs):
+        if (isinstance(data, ndarray) and data.ndim == 2
+                and data.dtype.kind in "iuf"):
+            # numbers only: one format call per row,
+            # built from the value format for each column
+            rowFormat = cls.separator.join(
+                    [cls.valueFormat.replace("{0", "{")] * data.shape[1])
+            return cls.newline.join([rowFormat.format(*row)
+                                     for row in data.tolist()])
         return cls.newline.join([cls.formatRow(row, **kwargs)
                                  for row in data])
 
@@ -2,7 +2,7 @@
 # dataobj/dataconfig.py
 
 from abc import ABCMeta, abstractproperty
-from types import MethodType
+from collections import OrderedDict
 import numpy
 
 from ..bases.algorithm import AlgorithmBase
@@ -11,23 +11,6 @@ from ..utils.mixedmethod import mixedmethod
 from ..utils.units import NoUnit, Fraction
 from ..utils import isCallable, classname
 
-def funcNotInFuncList(f, flst):
-    """Custom predicate for comparing bounded methods:
-    Duplicate only if instance ID and method name match.
-    """
-    if not isinstance(f, MethodType):
-        return (f not in flst)
-
-    idExists = (id(f.__self__) in [id(of.__self__)
-                    for of in flst if isinstance(of, MethodType)])
-    if not idExists:
-        return True
-    nameExists = (f.__func__.__name__ in [of.__func__.__name__
-                    for of in flst if isinstance(of, MethodType)])
-    if not nameExists:
-        return True
-    return False # both exist
-
 class CallbackRegistry(object):
     _callbacks = None # registered callbacks on certain events
 
@@ -42,23 +25,25 @@ class CallbackRegistry(object):
         if self._callbacks is None: # lazy init
             self._callbacks = dict()
         if what not in self._callbacks:
-            self._callbacks[what] = []
+            # keys preserve the registration order, values are unused;
+            # bound methods compare equal for the same instance and method
+            self._callbacks[what] = OrderedDict()
         for f in func:
-            if funcNotInFuncList(f, self._callbacks[what]):
-                self._callbacks[what].append(f)
+            self._callbacks[what][f] = True
 
     def callback(self, what, *args, **kwargs):
         self._assertPurpose(what)
         if self._callbacks is None:
             return
-        funcLst = []
-        for func in self._callbacks.get(what, []):
+        funcs = self._callbacks.get(what)
+        if not funcs:
+            return
+        for func in list(funcs):
             if not isCallable(func):
+                # remove invalid functions
+                del funcs[func]
                 continue
             func(*args, **kwargs)
-            funcLst.append(func)
-        # update the callback list, invalid functions removed
-        self._callbacks[what] = funcLst
 
     def _assertPurpose(self, what):
         assert what in self.callbackSlots, (
@@ -74,6 +59,7 @@ class DataConfig(AlgorithmBase, CallbackRegistry):
     _is2d = False
     _sampleName = None
     _x0seen, _x1seen = None, None # remembers data sets seen
+    _swappingLimits = False # limits are being swapped, defer callbacks
     parameters = (
         Parameter("x0Low", 0., unit = NoUnit(),
             displayName = "lower {x0} cut-off",
@@ -150,11 +136,19 @@ class DataConfig(AlgorithmBase, CallbackRegistry):
         self._onLimitUpdate("x1limits", self.x1Low, self.x1High)
 
     def _onLimitUpdate(self, callbackName, pLow, pHigh):
-        if not pLow() <= pHigh():
-            temp = pLow()
-            pLow.setValue(pHigh())
-            pHigh.setValue(temp)
-        self.callback(callbackName, (pLow(), pHigh()))
+        if self._swappingLimits:
+            return # the swapping call reports the final limits only
+        low, high = pLow(), pHigh()
+        if not low <= high:
+            self._swappingLimits = True
+            try:
+                pLow.setValue(high)
+                pHigh.setValue(low)
+            finally:
+                self._swappingLimits = False
+            # the new values may have been clipped to the value ranges
+            low, high = pLow(), pHigh()
+        self.callback(callbackName, (low, high))
 
     def updateFMasks(self):
         self.callback("fMasks", (self.fMaskZero(), self.fMaskNeg()))
@@ -172,21 +166,24 @@ class DataConfig(AlgorithmBase, CallbackRegistry):
         self.x1Low.setUnit(newUnit)
         self.x1High.setUnit(newUnit)
 
-    def onUpdatedX0(self, x0):
-        """Sets available range of loaded data."""
+    def onUpdatedX0(self, x0, x0Range = None):
+        """Sets available range of loaded data.
+        *x0Range* is the (min, max) of *x0*, if it is known already."""
+        if x0Range is None:
+            x0Range = (x0.min(), x0.max())
         if self._x0seen is None:
             # on the first data, set the param limits to the exact value range
-            limits = (x0.min(), x0.max())
+            limits = tuple(x0Range)
             self._x0seen = id(x0) # just store something for now
         else: # there were other data sets already, the value range grows
             # alternatives: (1) shrinking means another range for broader
             # datasets can not be selected in the UI;
             limits = self.x0Low.valueRange()
-            limits = min(x0.min(), limits[0]), max(x0.max(), limits[1])
+            limits = min(x0Range[0], limits[0]), max(x0Range[1], limits[1])
         self.x0Low.setValueRange(limits)
         self.x0High.setValueRange(limits)
 
-    def onUpdatedX1(self, x1):
+    def onUpdatedX1(self, x1, x1Range = None):
         pass
 
     def hdfWrite(self, hdf):
@@ -61,6 +61,35 @@ def testCallbacks():
     assert_raises(FMasksCallbackRun, dc.fMaskNeg.setValue, True)
     assert dc.fMaskNeg()
 
+def testSwappedLimits():
+    calls = []
+    def record(*args):
+        calls.append(args)
+    dc = DataConfig()
+    dc.register("x0limits", record)
+    dc.x0High.setValue(5.)
+    del calls[:]
+    dc.x0Low.setValue(8.) # above x0High, both get swapped
+    assert dc.x0Low()  == 5.
+    assert dc.x0High() == 8.
+    assert calls == [((5., 8.),)]
+
+def testRegisterTwice():
+    calls = []
+    class Receiver(object):
+        def first(self, *args):
+            calls.append("first")
+        def second(self, *args):
+            calls.append("second")
+    receiver = Receiver()
+    dc = DataConfig()
+    dc.register("fMasks", receiver.second)
+    dc.register("fMasks", receiver.first)
+    # a new bound method object of the same instance and method
+    dc.register("fMasks", receiver.second, receiver.first)
+    dc.fMaskZero.setValue(True)
+    assert calls == ["second", "first"]
+
 def testSerialize():
     def dummyFunc(*args):
         pass
@@ -5,7 +5,6 @@
 Represents input data associated with a measurement.
 """
 
-from builtins import range
 import os # Miscellaneous operating system interfaces
 from numpy import all as np_all
 import numpy as np
@@ -24,6 +23,9 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
     _filename = None
     _config = None
     _validMask = None
+    _maskBuffer = None # temporary for each mask condition
+    _baseMask = None # data dependent part of the mask, independent of config
+    _baseMaskSource = None # the data vectors and versions of _baseMask
     _x0 = None
     _x1 = None
     _x2 = None
@@ -181,8 +183,7 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         # FIXME: Problem with a many2one relation (many data sets, one config)
         #        -> What is the valid range supposed to be?
         #           Atm, the smallest common range wins. [ingo]
-        self.config.onUpdatedX0(self.x0.siData)
-        self._excludeInvalidX0()
+        self.config.onUpdatedX0(self.x0.siData, self.x0.siRange)
         self._reBin()
         if not self.is2d:
             return # self.x1 will be None
@@ -190,16 +191,17 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         self.config.x1Low.formatDisplayName(x1 = self.x1.name)
         self.config.x1High.formatDisplayName(x1 = self.x1.name)
         self.config.updateX1Unit(self.x1.unit)
-        self.config.onUpdatedX1(self.x1.siData)
+        self.config.onUpdatedX1(self.x1.siData, self.x1.siRange)
 
     def hdfWrite(self, hdf):
         hdf.writeMember(self, "filename")
         hdf.writeMembers(self, "f", "x0", "x1", "config")
 
     def _excludeInvalidX0(self):
-        validX0Idx = 0 # get the first data point index above 0
-        while self.x0.siData[validX0Idx] <= 0.0:
-            validX0Idx += 1
+        """Removes data points at x0 <= 0 from the mask of valid data."""
+        if self.x0 is None:
+            return
+        self._restrictMask(np.greater, self.x0.siData, 0.0)
 
     def _prepareUncertainty(self, *dummy):
         """Modifies the uncertainty of the whole range of measured data to be
@@ -209,10 +211,10 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         if not self.hasUncertainties:
             logging.warning("No error column provided! Using {}% of intensity."
                             .format(minUncertaintyPercent))
-            self.f.siDataU = siDataUMin
+            siDataU = siDataUMin
         else:
-            upd = np.maximum(self.f.unit.toSi(self.f.rawDataU), siDataUMin)
-            count = sum(upd <= siDataUMin)
+            siDataU = self.f.unit.toSi(self.f.rawDataU)
+            count = np.count_nonzero(siDataU <= siDataUMin)
             if count > 0:
                 logging.warning("Minimum uncertainty of {}% intensity set "
                                 "for {} data points.".format(
@@ -220,10 +222,12 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
             else:
                 logging.info("No data point falls behind minimum uncertainty "
                          "of {}% intensity.".format(minUncertaintyPercent))
-            self.f.siDataU = upd
+            # siDataUMin is a fresh array, reuse it for the result
+            siDataU = np.maximum(siDataU, siDataUMin, out = siDataUMin)
         # reset invalid uncertainties to np.inf
-        invInd = (True ^ np.isfinite(self.f.siDataU))
-        self.f.siDataU[invInd] = np.inf
+        np.copyto(siDataU, np.inf, where = ~np.isfinite(siDataU))
+        # set when complete, updates the valid uncertainties
+        self.f.siDataU = siDataU
 
     @property
     def hasUncertainties(self):
@@ -237,53 +241,78 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         raise NotImplementedError
 
     def _initMask(self):
-        # init indices: index array is more flexible than boolean masks
+        # init the mask of valid data, a new array for each update
         if self.f is None:
             return
-        self._validMask = np.isfinite(self.f.siData)
+        # the data vectors and their versions of siData
+        source = (self.f, self.f.siVersion,
+                  self.x0, getattr(self.x0, "siVersion", None))
+        if source != self._baseMaskSource:
+            # the data changed: finite values at valid x0 only
+            self._validMask = np.isfinite(self.f.siData)
+            # receives each condition before it is combined with the mask
+            self._maskBuffer = np.empty_like(self._validMask)
+            self._excludeInvalidX0()
+            self._baseMask = self._validMask
+            self._baseMaskSource = source
+        # the config dependent conditions start from the cached base
+        self._validMask = self._baseMask.copy()
+
+    def _restrictMask(self, condition, values, threshold):
+        """Removes data points from the mask of valid data which do not
+        satisfy the comparison *condition(values, threshold)*, a numpy
+        ufunc. It is evaluated into a reused buffer, no new array."""
+        condition(values, threshold, out = self._maskBuffer)
+        self._validMask &= self._maskBuffer
 
     def _propagateMask(self):
-        # store
-        validIndices = np.argwhere(self._validMask)[:,0]
-        # pass on all valid indices to the parameters
-        self.f.validIndices = validIndices
-        self.x0.validIndices = validIndices
+        # pass on the mask of valid data to the parameters as it is, no
+        # conversion to indices; _initMask() creates a new one on updates
+        self.f.validMask = self._validMask
+        self.x0.validMask = self._validMask
         if isinstance(self.x1, DataVector):
-            self.x1.validIndices = validIndices
+            self.x1.validMask = self._validMask
         if isinstance(self.x2, DataVector):
-            self.x2.validIndices = validIndices
+            self.x2.validMask = self._validMask
         # add onMaskUpdate() or validIndicesUpdated() callback here
 
     def _applyFMasks(self):
         # Optional masking of negative intensity
-        if self.config.fMaskZero():
-            # FIXME: compare with machine precision (EPS)?
-            self._validMask &= (self.f.siData != 0.0)
         if self.config.fMaskNeg():
-            self._validMask &= (self.f.siData > 0.0)
+            # excludes zero as well, no need to test that separately
+            self._restrictMask(np.greater, self.f.siData, 0.0)
+        elif self.config.fMaskZero():
+            # FIXME: compare with machine precision (EPS)?
+            self._restrictMask(np.not_equal, self.f.siData, 0.0)
 
     def _applyLimits(self):
         # clip to q bounds
-        self._validMask &= (self.x0.siData >= self.config.x0Low())
-        self._validMask &= (self.x0.siData <= self.config.x0High())
+        self._restrictMask(np.greater_equal, self.x0.siData,
+                           self.config.x0Low())
+        self._restrictMask(np.less_equal, self.x0.siData,
+                           self.config.x0High())
         # clip to psi bounds
         if not self.is2d:
             return
         # -> is it important to use '>' here, instead of '>=' for x0?
-        self._validMask &= (self.x1.siData >  self.config.x1Low())
-        self._validMask &= (self.x1.siData <= self.config.x1High())
-
-    def _onFMasksUpdate(self, *args):
+        self._restrictMask(np.greater, self.x1.siData,
+                           self.config.x1Low())
+        self._restrictMask(np.less_equal, self.x1.siData,
+                           self.config.x1High())
+
+    def _updateMask(self):
+        """Builds the mask of valid data from all criteria in one go and
+        passes it on, after a change of any of them."""
         self._initMask()
         self._applyFMasks()
         self._applyLimits()
         self._propagateMask()
 
+    def _onFMasksUpdate(self, *args):
+        self._updateMask()
+
     def _onLimitsUpdate(self, *args):
-        self._initMask()
-        self._applyFMasks()
-        self._applyLimits()
-        self._propagateMask()
+        self._updateMask()
 
     def _reBin(self):
         """Rebinning method, to be run (f.ex.) upon every "Start" buttonpress.
@@ -304,41 +333,49 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         logging.info("Initiating binning procedure for {} bins".format(nBin))
 
         # self._binned = DataVector() once binning finishes.. dataVector can be set once.
-        x0Bin = np.zeros(nBin)
-        fBin  = np.zeros(nBin)
-        fuBin  = np.zeros(nBin)
-        validMask = np.zeros(nBin, dtype = bool) #default false
-
         # prepare bin edges, log-spaced
         xEdges = np.logspace(
                 np.log10(sanX.min()),
                 np.log10(sanX.max() + np.diff(sanX)[-1]/100.), #include last point
                 nBin + 1)
 
-        # loop over bins:
-        for bini in range(nBin):
-            fBin[bini], fuBin[bini], x0Bin[bini] = None, None, None # default
-            fMask = ((sanX >= xEdges[bini]) & (sanX < xEdges[bini + 1]))
-            fInBin, fuInBin = self.f.sanitized[fMask], self.f.sanitizedU[fMask]
-            fInBinDDoF = 0
-            if len(fInBin) > 1: # prevent division by zero in numpy.std()
-                fInBinDDoF = 1
-            x0InBin = self.x0.sanitized[fMask]
-            if fMask.sum() == 1:
-                fBin[bini], fuBin[bini], x0Bin[bini] = fInBin, fuInBin, x0InBin
-                validMask[bini] = True
-            elif fMask.sum() > 1:
-                fBin[bini], x0Bin[bini] = fInBin.mean(), x0InBin.mean()
-                validMask[bini] = True
-                # uncertainties are a bit more elaborate:
-                fuBin[bini] = np.maximum(
-                        fInBin.std(ddof = fInBinDDoF) / np.sqrt(1. * fMask.sum()), # SEM
-                        np.sqrt( (fuInBin**2).sum() / fMask.sum() ) #propagated. unc.
-                        )
+        # bin index of each data point, bin i covers edges i <= x < i+1,
+        # points outside of all bins get index nBin
+        binIdx = np.empty(len(sanX), dtype = np.intp)
+        binIdx.fill(nBin)
+        inside = (sanX >= xEdges[0]) & (sanX < xEdges[-1])
+        xInside = sanX[inside]
+        logLow, logHigh = np.log10(xEdges[0]), np.log10(xEdges[-1])
+        idx = ((np.log10(xInside) - logLow) * (nBin / (logHigh - logLow))
+              ).astype(np.intp)
+        np.clip(idx, 0, nBin - 1, out = idx)
+        # points rounded into a neighbouring bin are moved to their edges
+        idx -= (xInside < xEdges[idx])
+        idx += (xInside >= xEdges[idx + 1])
+        binIdx[inside] = idx
+
+        # sums over all bins at once, the last one collects outside points
+        def binSum(weights):
+            return np.bincount(binIdx, weights = weights,
+                               minlength = nBin + 1)[:nBin]
+        fIn, fuIn = self.f.sanitized, self.f.sanitizedU
+        count = binSum(None)
+        validMask = (count > 0)
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            fBin  = binSum(fIn) / count # NaN for empty bins
+            x0Bin = binSum(sanX) / count
+            # uncertainties are a bit more elaborate:
+            # the larger of the SEM and the propagated uncertainty,
+            # a bin with a single point keeps its uncertainty
+            fDev = fIn - fBin[np.minimum(binIdx, nBin - 1)]
+            fuBin = np.maximum(
+                    np.sqrt(binSum(fDev**2) / (count - 1) / count), # SEM
+                    np.sqrt(binSum(fuIn**2) / count)) # propagated unc.
+        single = (count == 1)
+        fuBin[single] = binSum(fuIn)[single]
 
         # remove empty bins:
-        validi = (True ^ np.isnan(fBin))
-        validi[np.argwhere(validMask != True)] = False
+        validi = validMask & ~np.isnan(fBin)
         # store values:
         self.f.binnedData, self.f.binnedDataU = fBin[validi], fuBin[validi]
         self.x0.binnedData = x0Bin[validi] # self.x0.unit.toDisplay(x0Bin[validi])
@@ -354,7 +391,17 @@ class DataObj(with_metaclass(ABCMeta, type('NewBase', (DataSet, DisplayMixin), {
         return value
 
     def __eq__(self, other):
-        return hash(self) == hash(other)
+        # cheap comparisons first, the data arrays only if they may match
+        if not isinstance(other, DataObj):
+            return False
+        if self.filename != other.filename or self.title != other.title:
+            return False
+        a, b = self.rawArray, other.rawArray
+        if a is b:
+            return True
+        if a is None or b is None or a.shape != b.shape:
+            return False
+        return np.array_equal(a, b)
 
     def __neq__(self, other):
         return not self.__eq__(other)
@@ -21,7 +21,13 @@ class DataVector(object):
     _binnedDataU = None # binned, sanitized data
     _unit = None # instance of unit
     _limit = None # two-element vector with min-max
-    _validIndices = None # valid indices.
+    _validMask = None # boolean mask of valid data
+    _validIndices = None # valid indices, derived from the mask on demand
+    _sanitized = None # valid data in si units, cached until changed
+    _sanitizedU = None # valid uncertainties in si units, cached as well
+    _siRange = None # min-max of all data in si units, cached until changed
+    _siVersion = 0 # counts the changes of siData, for caches elsewhere
+    _limsString = None # formatted limits for the UI, cached as well
 
     def hdfWrite(self, hdf):
         hdf.writeMembers(self, "rawData", "rawDataU", "siData", "siDataU",
@@ -32,46 +38,80 @@ class DataVector(object):
         self._rawData = raw
         self._rawDataU = rawU
         self.unit = unit
-        self.validIndices = np.arange(self.rawData.size) # sets limits as well
+        # resets the limits as well
+        self.validMask = np.ones(self.rawData.size, dtype = bool)
 
     @property
     def name(self):
         return str(self._name)
 
+    @property
+    def validMask(self):
+        return self._validMask
+
+    @validMask.setter
+    def validMask(self, mask):
+        assert mask.dtype == bool and mask.size == self.siData.size
+        self._validMask = mask
+        self._validIndices = None
+        self._limit, self._limsString = None, None
+        self._resetSanitized()
+
     @property
     def validIndices(self):
+        if self._validIndices is None:
+            self._validIndices = np.flatnonzero(self.validMask)
         return self._validIndices
 
     @validIndices.setter
     def validIndices(self, indices):
         if len(indices):
             assert indices.min() >= 0
-            assert indices.max() <= self.siData.size
-        self._validIndices = indices
-        if len(indices):
-            self._limit = [self.sanitized.min(), self.sanitized.max()]
-        else:
-            self._limit = [0., 0.]
+            assert indices.max() < self.siData.size
+        mask = np.zeros(self.siData.size, dtype = bool)
+        mask[indices] = True
+        self.validMask = mask
+
+    def _resetSanitized(self):
+        """Discards the cached valid data after the data or indices
+        changed."""
+        self._sanitized, self._sanitizedU = None, None
+
+    @classmethod
+    def _readOnly(cls, vec):
+        # shared by all readers, in-place changes would alter the cache
+        vec.flags.writeable = False
+        return vec
 
     @property
     def sanitized(self):
-        return self.siData.copy()[self.validIndices]
+        if self._sanitized is None: # indexing copies already
+            self._sanitized = self._readOnly(self.siData[self.validMask])
+        return self._sanitized
 
     @sanitized.setter
     def sanitized(self, val):
         assert(val.size == self.validIndices.size)
-        self.siData[self.validIndices] = val
+        if self.siData is self.rawData: # copy on write
+            self.siData = self.rawData.copy()
+        self.siData[self.validMask] = val
+        self._siDataChanged()
 
     @property
     def sanitizedU(self):
         if self.siDataU is None:
             return None
-        return self.siDataU.copy()[self.validIndices]
+        if self._sanitizedU is None:
+            self._sanitizedU = self._readOnly(self.siDataU[self.validMask])
+        return self._sanitizedU
 
     @sanitizedU.setter
     def sanitizedU(self, val):
         assert(val.size == self.validIndices.size)
-        self.siDataU[self.validIndices] = val
+        if self.siDataU is self.rawDataU: # copy on write
+            self.siDataU = self.rawDataU.copy()
+        self.siDataU[self.validMask] = val
+        self._resetSanitized()
 
     # siData
     @property
@@ -81,6 +121,28 @@ class DataVector(object):
     @siData.setter
     def siData(self, vec):
         self._siData = vec
+        self._siDataChanged()
+
+    def _siDataChanged(self):
+        """Discards everything derived from siData after it was replaced or
+        written to."""
+        self._siRange = None
+        self._siVersion += 1
+        self._resetSanitized()
+
+    @property
+    def siVersion(self):
+        """Changes whenever siData is replaced or written to. Allows
+        others to detect outdated results derived from siData."""
+        return self._siVersion
+
+    @property
+    def siRange(self):
+        """The (min, max) tuple of all data in si units, regardless of the
+        mask of valid data."""
+        if self._siRange is None:
+            self._siRange = (self.siData.min(), self.siData.max())
+        return self._siRange
 
     # siDataU, uncertainties on siData
     @property
@@ -90,6 +152,7 @@ class DataVector(object):
     @siDataU.setter
     def siDataU(self, vec):
         self._siDataU = vec
+        self._resetSanitized()
 
     # binnedDataU, uncertainties on siData
     @property
@@ -132,28 +195,46 @@ class DataVector(object):
     @unit.setter
     def unit(self, newUnit):
         if not isinstance(newUnit, Unit):
-            self._unit = NoUnit()
-            self.siData = self.rawData.copy()
-            if self.rawDataU is not None:
-                self.siDataU = self.rawDataU.copy()
+            newUnit = NoUnit()
+        self._unit = newUnit
+        self._limsString = None
+        if self._isIdentity(newUnit):
+            # share the raw data, the sanitized setters copy before writing
+            toSi = lambda vec: vec
         else:
-            self._unit = newUnit
-            self.siData = self.unit.toSi(self.rawData)
-            if self.rawDataU is not None:
-                self.siDataU = self.unit.toSi(self.rawDataU)
+            toSi = newUnit.toSi
+        self.siData = toSi(self.rawData)
+        if self.rawDataU is not None:
+            self.siDataU = toSi(self.rawDataU)
+
+    @staticmethod
+    def _isIdentity(unit):
+        """True if the unit converts to si units by a factor of one."""
+        return (type(unit).toSi is Unit.toSi
+                and unit.magnitudeConversion == 1.)
 
     # TODO: define min/max properties for convenience?
     @property
     def limit(self):
+        # determined on demand, the mask may change several times before
+        if self._limit is None:
+            if len(self.sanitized):
+                self._limit = [self.sanitized.min(), self.sanitized.max()]
+            else:
+                self._limit = [0., 0.]
         return self._limit
 
     @property
     def limsString(self):
-        return u"{0:.3g} ≤ {valName} ({magnitudeName}) ≤ {1:.3g}".format(
-                self.unit.toDisplay(self.limit[0]),
-                self.unit.toDisplay(self.limit[1]),
-                magnitudeName = self.unit.displayMagnitudeName,
-                valName = self.name)
+        # requested on each UI refresh, changes with the limits or unit only
+        if self._limsString is None:
+            self._limsString = (
+                u"{0:.3g} ≤ {valName} ({magnitudeName}) ≤ {1:.3g}".format(
+                    self.unit.toDisplay(self.limit[0]),
+                    self.unit.toDisplay(self.limit[1]),
+                    magnitudeName = self.unit.displayMagnitudeName,
+                    valName = self.name))
+        return self._limsString
 
 if __name__ == "__main__":
     import doctest
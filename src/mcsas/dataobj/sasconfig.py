@@ -18,6 +18,7 @@ class SmearingConfig(with_metaclass(ABCMeta, AlgorithmBase)):
     """Abstract base class, can't be instantiated."""
     _qOffset = None # integration point positions, depends on beam profile
     _weights = None # integration weight per position, depends on beam profile
+    _integration = None # integration weights and the positions they belong to
     shortName = "SAS smearing configuration"
     parameters = (
         Parameter("doSmear", False, unit = NoUnit(),
@@ -64,6 +65,25 @@ class SmearingConfig(with_metaclass(ABCMeta, AlgorithmBase)):
     def prepared(self):
         return self._qOffset, self._weights
 
+    @property
+    def integrationWeights(self):
+        """Weights integrating over the prepared positions of the beam
+        profile by the trapezoidal rule, combined with the profile. Kept
+        until the integration points change."""
+        qOffset, weights = self.prepared
+        cached = self._integration
+        if (cached is None or cached[0] is not qOffset
+                or cached[1] is not weights):
+            halfSteps = .5 * np.diff(qOffset)
+            integWeights = np.zeros(len(qOffset))
+            integWeights[:-1] += halfSteps
+            integWeights[1:] += halfSteps
+            integWeights *= weights
+            # the profile covers one side only
+            integWeights *= 2.
+            self._integration = cached = (qOffset, weights, integWeights)
+        return cached[2]
+
     def __str__(self):
         s = [str(id(self)) + " " + super(SmearingConfig, self).__str__()]
         s.append("  qOffset: {}".format(self.qOffset))
@@ -111,10 +131,11 @@ class TrapezoidSmearing(SmearingConfig):
         logging.debug("halfTrapzPDF called")
         assert(d > 0.)
         x = abs(x)
-        pdf = x * 0.
+        pdf = np.zeros_like(x)
         pdf[x < c] = 1.
         if d > c:
-            pdf[(c <= x) & (x < d)] = (1./(d - c)) * (d - x[(c <= x) & (x < d)])
+            slope = (c <= x) & (x < d)
+            pdf[slope] = (1./(d - c)) * (d - x[slope])
         norm = 1./(d + c)
         pdf *= norm
         return pdf, norm
@@ -131,7 +152,7 @@ class TrapezoidSmearing(SmearingConfig):
 
         # following qOffset is used for Pinhole and Rectangular
         qOffset = np.logspace(np.log10(q.min() / 5.),
-                np.log10(xb / 2.), num = np.ceil(n / 2.))
+                np.log10(xb / 2.), num = int(np.ceil(n / 2.)))
         qOffset = np.concatenate((-qOffset[::-1], [0,], qOffset))
         if not self.twoDColl():
             # overwrite prepared integration steps qOffset:
@@ -218,7 +239,7 @@ class GaussianSmearing(SmearingConfig):
 
         # following qOffset is used for Pinhole and Rectangular
         qOffset = np.logspace(np.log10(q.min() / 3.),
-                np.log10(2.5 * GVar), num = np.ceil(n / 2.))
+                np.log10(2.5 * GVar), num = int(np.ceil(n / 2.)))
         qOffset = np.concatenate((-qOffset[::-1], [0,], qOffset))
         if not self.twoDColl():
             # overwrite prepared integration steps qOffset:
@@ -272,16 +293,16 @@ class SASConfig(DataConfig):
         lst.remove("fMaskNeg")
         return lst
 
-    def onUpdatedX0(self, x0):
+    def onUpdatedX0(self, x0, x0Range = None):
         """Sets available range of loaded data."""
-        super(SASConfig, self).onUpdatedX0(x0)
+        super(SASConfig, self).onUpdatedX0(x0, x0Range)
         if self.smearing is None:
             return
         self.smearing.updateQLimits((self.x0Low(), self.x0High()))
         self.smearing.updateSmearingLimits(x0)
 
-    def onUpdatedX1(self, x1):
-        super(SASConfig, self).onUpdatedX1(x1)
+    def onUpdatedX1(self, x1, x1Range = None):
+        super(SASConfig, self).onUpdatedX1(x1, x1Range)
         # TODO
 
     def updateX0Unit(self, newUnit):
@@ -33,6 +33,7 @@ class SASData(DataObj):
     _sizeEst = None
     _shannonChannelEst = None
     _rUnit = None # defines units for r used in sizeest
+    _qUnique = None # q along with its unique values and inverse indices
 
     # define DataObj interface
 
@@ -53,6 +54,15 @@ class SASData(DataObj):
         Provided for convenience use within models."""
         return self.x0.binnedData # reverts to sanitized if not binned
 
+    def uniqueQ(self):
+        """Returns the sorted unique values of q and the indices to
+        reconstruct q from them. Models can evaluate the unique values only
+        if q contains duplicates, e.g. for stitched data sets."""
+        q = self.q
+        if self._qUnique is None or self._qUnique[0] is not q:
+            self._qUnique = (q,) + tuple(np.unique(q, return_inverse = True))
+        return self._qUnique[1:]
+
     @property
     def pLimsString(self):
         """Properly formatted q-limits for UI label text."""
@@ -139,16 +149,18 @@ class SASData(DataObj):
         if rawArray is None:
             logging.error('SASData must be called with a rawArray provided')
 
-        self.x0 = DataVector(u'q', rawArray[:, 0],
+        # one contiguous row per column, slicing the (N, k) array directly
+        # gives strided views
+        columns = np.ascontiguousarray(rawArray.T)
+        self.x0 = DataVector(u'q', columns[0],
                              unit = ScatteringVector(u"nm⁻¹"))
-        self.f  = DataVector(u'I', rawArray[:, 1], rawU = rawArray[:, 2],
+        self.f  = DataVector(u'I', columns[1], rawU = columns[2],
                              unit = ScatteringIntensity(u"(m sr)⁻¹"))
         # sanitized uncertainty, we should use self._e.copy
         logging.info("Init SASData: " + self.qLimsString)
-        if (rawArray.shape[1] > 3 and rawArray[:, 3].min()
-                                   != rawArray[:, 3].max()):
+        if (len(columns) > 3 and columns[3].min() != columns[3].max()):
             # psi column is present and contains some data
-            self.x1 = DataVector(u'ψ', rawArray[:, 3], unit = Angle(u"°"))
+            self.x1 = DataVector(u'ψ', columns[3], unit = Angle(u"°"))
             logging.info(self.pLimsString)
 
         #set unit definitions for display and internal units
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# dataobj/sasdata_test.py
+
+import numpy
+
+from .sasdata import SASData
+
+def getTestData(q):
+    intensity = 1. / (1. + q**2)
+    return numpy.vstack((q, intensity, intensity * 0.01)).T
+
+def testExcludeInvalidX0():
+    q = numpy.concatenate(((0., -1.), numpy.logspace(-2, 1, 2000)))
+    data = SASData(title = "test", rawArray = getTestData(q))
+    assert len(data.x0.sanitized) == len(q) - 2
+    assert data.x0.sanitized.min() > 0.
+    assert numpy.all(numpy.isfinite(data.q))
+
+def testMaskAfterWrite():
+    # values written in place must be masked on the next update
+    q = numpy.logspace(-2, 1, 50)
+    data = SASData(title = "test", rawArray = getTestData(q))
+    f = data.f.sanitized * 2.
+    data.f.sanitized = f
+    data._onLimitsUpdate()
+    assert len(data.f.sanitized) == 50
+    f[10:15] = numpy.nan
+    data.f.sanitized = f
+    data._onLimitsUpdate()
+    assert len(data.f.sanitized) == 45
+    assert numpy.all(numpy.isfinite(data.f.sanitized))
+
+def reBinDirect(x, f, fu, xEdges):
+    """Per-bin reference of the rebinning, mean and uncertainty of each
+    nonempty bin, the larger of SEM and propagated uncertainty."""
+    result = []
+    for low, high in zip(xEdges[:-1], xEdges[1:]):
+        inBin = (x >= low) & (x < high)
+        count = inBin.sum()
+        if count == 0:
+            continue
+        if count == 1:
+            result.append((x[inBin][0], f[inBin][0], fu[inBin][0]))
+            continue
+        sem = f[inBin].std(ddof = 1) / numpy.sqrt(count)
+        propagated = numpy.sqrt((fu[inBin]**2).sum() / count)
+        result.append((x[inBin].mean(), f[inBin].mean(),
+                       max(sem, propagated)))
+    return numpy.array(result).T
+
+def testReBin():
+    # dense at low q, sparse at high q: bins with many, single and no points
+    rng = numpy.random.RandomState(42)
+    q = numpy.concatenate((numpy.logspace(-2, -1, 300),
+                           (0.15, 0.3, 0.31, 0.9, 2., 2.05, 2.1, 9.)))
+    rawArray = getTestData(q)
+    # noise larger than the uncertainty in some bins: SEM wins there
+    rawArray[:, 1] *= 1. + 0.05 * rng.standard_normal(len(q))
+    data = SASData(title = "test", rawArray = rawArray)
+    nBin = 60
+    data.config.nBin.setValue(nBin)
+    data._reBin()
+    x, f, fu = data.x0.sanitized, data.f.sanitized, data.f.sanitizedU
+    xEdges = numpy.logspace(numpy.log10(x.min()),
+                            numpy.log10(x.max() + numpy.diff(x)[-1] / 100.),
+                            nBin + 1)
+    counts = numpy.histogram(x, xEdges)[0]
+    assert (counts == 0).any() and (counts == 1).any() and (counts > 2).any()
+    xRef, fRef, fuRef = reBinDirect(x, f, fu, xEdges)
+    assert len(data.x0.binnedData) == len(xRef)
+    numpy.testing.assert_allclose(data.x0.binnedData, xRef, rtol = 1e-12)
+    numpy.testing.assert_allclose(data.f.binnedData, fRef, rtol = 1e-12)
+    numpy.testing.assert_allclose(data.f.binnedDataU, fuRef, rtol = 1e-12)
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
@@ -35,7 +35,7 @@ class OptimizationWidget(AlgorithmWidget):
             widgetType = AdvancedSettings, widgets = tuple(self.makeWidgets(
                 "numContribs", "compensationExponent", 
                 "findBackground", "positiveBackground", "maxIterations", 
-                "showIncomplete", "seriesStats")))
+                "showIncomplete", "seriesStats", "singlePrecision")))
         hlayout.addWidget(self.defaults)
         hlayout.addWidget(self.advanced)
         self.sigValueChanged.connect(self.advanced.updateWidgets)
@@ -2,6 +2,7 @@
 # mcsas/backgroundscalingfit.py
 # Find the reST syntax at http://sphinx-doc.org/rest.html
 
+import numpy
 from scipy import optimize
 from ..bases.model import SASModel
 
@@ -23,8 +24,10 @@ class BackgroundScalingFit(object):
     :arg sc: A 2-element array of initial guesses for scaling
              factor and background
     :arg ver: *(optional)* Can be set to 1 for old version, more robust
-              but slow, default 2 for new version,
-              10x faster than version 1, requires decent starting values
+              but slow, default 2 for new version, solves the linear
+              least squares problem directly, needs no starting values,
+              3 for the iterative Levenberg-Marquardt method,
+              requires decent starting values
     :arg outputIntensity: *(optional)* Return the scaled intensity as
                           third output argument, default: False
     :arg background: *(optional)* Enables a flat background contribution,
@@ -38,6 +41,7 @@ class BackgroundScalingFit(object):
     """
     _findBackground = None # True: find optimal background as well
     _positiveBackground = None # True: Fix background to positive values only
+    _prepared = None # measured data, uncertainties and their reciprocals
 
     def __init__(self, findBackground, positiveBackground, *args):
         self._findBackground = bool(findBackground)
@@ -74,14 +78,31 @@ class BackgroundScalingFit(object):
         """Reduced Chi-squared calculation, size of parameter-space not taken
         into account; for data with known intError.
         """
-        return sum(((dataMeas - dataCalc)/dataErr)**2) / len(dataMeas)
+        chi = (dataMeas - dataCalc) / dataErr
+        return numpy.dot(chi, chi) / len(dataMeas)
 
     @staticmethod
     def aGoFsAlpha(dataMeas, dataErr, dataCalc):
         """The alternative Goodness-of-Fit value without alpha, i.e. multiplied
         by alpha, according to [Henn 2016]
         ( http://dx.doi.org/10.1107/S2053273316013206 )."""
-        return sum((dataMeas - dataCalc)**2) / sum(dataErr**2)
+        diff = dataMeas - dataCalc
+        dataErr = numpy.broadcast_to(dataErr, diff.shape)
+        return numpy.dot(diff, diff) / numpy.dot(dataErr, dataErr)
+
+    @staticmethod
+    def goodnessOfFit(dataMeas, dataErr, dataCalc, weight = None):
+        """Returns the reduced chi-squared and the alternative
+        Goodness-of-Fit value without alpha, see :py:meth:`chiSqr` and
+        :py:meth:`aGoFsAlpha`, sharing the difference of both signals.
+        *weight* optionally provides the reciprocal of *dataErr*."""
+        diff = dataMeas - dataCalc
+        dataErr = numpy.broadcast_to(dataErr, diff.shape)
+        if weight is None:
+            weight = 1. / dataErr
+        chi = diff * weight
+        return (numpy.dot(chi, chi) / len(dataMeas),
+                numpy.dot(diff, diff) / numpy.dot(dataErr, dataErr))
 
     def dataScaled(self, data, sc):
         """Returns the input data scaled by the provided factor and background
@@ -98,23 +119,73 @@ class BackgroundScalingFit(object):
             func = self.chi
             if self._positiveBackground:
                 func = self.chiPosBg
+        # the derivatives of chi do not depend on the parameters,
+        # except for the sign of a positive background
+        weight = 1. / numpy.broadcast_to(dataErr, dataMeas.shape)
+        jacobian = numpy.vstack((-dataCalc * weight, -weight))
+        if not self._findBackground:
+            jacobian[1] = 0.
+        def derivatives(xsc, *args):
+            if func is self.chiPosBg:
+                return jacobian * ((1.,), (numpy.sign(xsc[1]),))
+            return jacobian
         sc, success = optimize.leastsq(func, sc, args = (dataMeas, dataErr, dataCalc),
+                                       Dfun = derivatives, col_deriv = True,
                                        full_output = False)
         return sc
 
+    def fitLinear(self, dataMeas, dataErr, dataCalc, sc, weight = None):
+        """Direct solution of the normal equations of the weighted linear
+        least squares problem for scaling and background. Returns a copy of
+        the initial guess *sc* if the model intensity vanishes.
+        *weight* optionally provides the reciprocal of *dataErr*."""
+        if weight is None:
+            weight = 1. / numpy.broadcast_to(dataErr, dataMeas.shape)
+        calc, meas = dataCalc * weight, dataMeas * weight
+        sCC, sCM = numpy.dot(calc, calc), numpy.dot(calc, meas)
+        if self._findBackground:
+            sCW, sWW = numpy.dot(calc, weight), numpy.dot(weight, weight)
+            sWM = numpy.dot(weight, meas)
+            det = sCC * sWW - sCW * sCW
+            if det != 0.:
+                background = (sCC * sWM - sCW * sCM) / det
+                # the best positive background is zero otherwise
+                if background >= 0. or not self._positiveBackground:
+                    return numpy.array(((sWW * sCM - sCW * sWM) / det,
+                                        background))
+        if sCC == 0.:
+            # a copy, the caller modifies the result
+            return numpy.array(sc, dtype = float)
+        return numpy.array((sCM / sCC, 0.))
+
     def fitSimplex(self, dataMeas, dataErr, dataCalc, sc):
         """Downhill Simplex (aka Nelder-Mead) method"""
         def residual(xsc):
             return self.chiSqr(dataMeas, dataErr, self.dataScaled(dataCalc, xsc))
+        # start at the linear solution, the simplex only has to confirm it
+        sc = self.fitLinear(dataMeas, dataErr, dataCalc, sc)
         sc = optimize.fmin(residual, sc, full_output = False, disp = 0)
         return sc
 
-    def calc(self, data, modelData, sc, ver = 2):
-        dataMeas = data.f.binnedData.flatten()
+    def prepare(self, data):
+        """Returns the measured intensities, their uncertainties and the
+        reciprocal uncertainties as flat arrays. They are kept as long as
+        the binned data arrays of *data* are the same."""
+        meas, err = data.f.binnedData, data.f.binnedDataU
+        cached = self._prepared
+        if cached is not None and cached[0] is meas and cached[1] is err:
+            return cached[2:]
+        dataMeas = meas.flatten()
         dataErr = 1.
-        if data.f.binnedDataU is not None:
-            dataErr = data.f.binnedDataU.flatten()
+        if err is not None:
+            dataErr = err.flatten()
             dataErr[dataErr == 0.0] = 1. # prevent division by zero
+        weight = 1. / numpy.broadcast_to(dataErr, dataMeas.shape)
+        self._prepared = (meas, err, dataMeas, dataErr, weight)
+        return dataMeas, dataErr, weight
+
+    def calc(self, data, modelData, sc, ver = 2):
+        dataMeas, dataErr, weight = self.prepare(data)
         dataCalc = modelData.chisqrInt
         if not len(dataMeas): # all data filtered
             return sc, 1., dataCalc, 1.
@@ -123,6 +194,8 @@ class BackgroundScalingFit(object):
         # find 2 values: scaling & background
         # least squares optimize them to match model data with measurement
         if ver == 2:
+            sc = self.fitLinear(dataMeas, dataErr, dataCalc, sc, weight)
+        elif ver == 3:
             sc = self.fitLM(dataMeas, dataErr, dataCalc, sc)
         else:
             sc = self.fitSimplex(dataMeas, dataErr, dataCalc, sc)
@@ -132,8 +205,9 @@ class BackgroundScalingFit(object):
         else:
             sc[1] = self.signBackground(sc[1])
         # calculate convergence value
-        conval = self.chiSqr(dataMeas, dataErr, self.dataScaled(dataCalc, sc))
-        aGoFs = self.aGoFsAlpha(dataMeas, dataErr, self.dataScaled(dataCalc, sc))
+        conval, aGoFs = self.goodnessOfFit(dataMeas, dataErr,
+                                           self.dataScaled(dataCalc, sc),
+                                           weight)
         # multiplied by the reciprocal of alpha
         aGoFs *= len(dataMeas) / (len(dataMeas) - modelData.numParams )
         return sc, conval, dataCalc, aGoFs
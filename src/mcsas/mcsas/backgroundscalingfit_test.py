@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# mcsas/backgroundscalingfit_test.py
+
+import numpy
+from numpy.testing import assert_allclose
+from scipy import optimize
+
+from .backgroundscalingfit import BackgroundScalingFit
+
+def getTestData(scaling = 3., background = 2.):
+    rng = numpy.random.RandomState(1234)
+    dataCalc = numpy.exp(-numpy.linspace(0., 5., 50)) * 1e2
+    dataErr = 0.05 * dataCalc + 0.1
+    dataMeas = (scaling * dataCalc + background
+                + dataErr * rng.standard_normal(dataCalc.size))
+    return dataMeas, dataErr, dataCalc
+
+def testFitLM():
+    dataMeas, dataErr, dataCalc = getTestData()
+    sc = numpy.array((1., 0.))
+    for findBackground in (True, False):
+        fit = BackgroundScalingFit(findBackground, False)
+        scLM = fit.fitLM(dataMeas, dataErr, dataCalc, sc)
+        scLin = fit.fitLinear(dataMeas, dataErr, dataCalc, sc)
+        if not findBackground:
+            scLM[1] = 0. # unused by the fit
+        assert_allclose(scLM, scLin, rtol = 1e-6, atol = 1e-9)
+
+def fitReference(fit, dataMeas, dataErr, dataCalc, sc):
+    func = fit.chi if fit._findBackground else fit.chiNoBg
+    sc, dummy = optimize.leastsq(func, sc, args = (dataMeas, dataErr, dataCalc),
+                                 xtol = 1e-12, ftol = 1e-12)
+    return sc
+
+def testFitLinear():
+    dataMeas, dataErr, dataCalc = getTestData()
+    sc = numpy.array((1., 0.))
+    for findBackground in (True, False):
+        fit = BackgroundScalingFit(findBackground, False)
+        scLin = fit.fitLinear(dataMeas, dataErr, dataCalc, sc)
+        scRef = fitReference(fit, dataMeas, dataErr, dataCalc, sc)
+        if not findBackground:
+            assert scLin[1] == 0.
+            scRef[1] = 0. # unused by the fit
+        assert_allclose(scLin, scRef, rtol = 1e-8)
+
+def testFitLinearPositiveBackground():
+    # a negative background is replaced by the best fit without one
+    dataMeas, dataErr, dataCalc = getTestData(background = -5.)
+    sc = numpy.array((1., 0.))
+    scFree = BackgroundScalingFit(True, False).fitLinear(
+                    dataMeas, dataErr, dataCalc, sc)
+    assert scFree[1] < 0.
+    fit = BackgroundScalingFit(True, True)
+    scLin = fit.fitLinear(dataMeas, dataErr, dataCalc, sc)
+    assert scLin[1] == 0.
+    scRef = fitReference(BackgroundScalingFit(False, False),
+                         dataMeas, dataErr, dataCalc, sc)
+    assert_allclose(scLin[0], scRef[0], rtol = 1e-8)
+
+def testFitLinearNoIntensity():
+    dataMeas, dataErr, dataCalc = getTestData()
+    sc = numpy.array((1., 2.))
+    for findBackground in (True, False):
+        fit = BackgroundScalingFit(findBackground, False)
+        scLin = fit.fitLinear(dataMeas, dataErr, numpy.zeros_like(dataCalc), sc)
+        assert_allclose(scLin, (1., 2.))
+        assert scLin is not sc
+        scLin[1] = 0. # as calc() does, must not alter the initial guess
+        assert sc[1] == 2.
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
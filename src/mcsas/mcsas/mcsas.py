@@ -4,7 +4,7 @@
 
 import numpy # For arrays
 from numpy import (inf, array, reshape, shape, pi, diff, zeros,
-                  size, sum, sqrt, log10,
+                  size, sqrt, log10,
                   isnan, newaxis)
 # useful for debugging numpy RuntimeWarnings
 # numpy.seterr(all = "raise", under = "ignore")
@@ -16,7 +16,7 @@ logging.basicConfig(level = logging.INFO)
 
 from ..utils import isList 
 from ..bases.dataset import DataSet
-from ..bases.algorithm import AlgorithmBase
+from ..bases.algorithm import AlgorithmBase, seedRandomGenerator
 from ..utils.parameter import isActiveFitParam
 from ..utils.tests import isMac
 from ..bases.model import ScatteringModel
@@ -136,6 +136,7 @@ class McSAS(AlgorithmBase):
     data = None
     model = None
     result = None
+    _trialBatchSize = 1024 # trial parameters drawn at once in mcFit()
 
     # there are several ways to accomplish this depending on where/when
     # McSASParameters() should be called: when creating an instance or
@@ -146,8 +147,10 @@ class McSAS(AlgorithmBase):
         return super(McSAS, cls).factory("McSAS",
                                          *McSASParameters().parameters)
 
-    def calc(self, **kwargs):
+    def calc(self, seed = None, **kwargs):
         # initialize
+        if seed is not None: # reproducible draws for this run
+            seedRandomGenerator(seed)
         self.result = [] # TODO
         self.stop = False # TODO, move this into some simple result structure
 
@@ -209,6 +212,9 @@ class McSAS(AlgorithmBase):
         times = zeros(numReps)
         contribMeasVal = zeros([1, self.data.count, numReps])
 
+        # the same for each repetition
+        convergenceCriterion = self.convergenceCriterion()
+        hasActiveParams = any(isActiveFitParam(p) for p in self.model.params())
         # This is the loop that repeats the MC optimization numReps times,
         # after which we can calculate an uncertainty on the Results.
         for nr in range(numReps):
@@ -217,7 +223,7 @@ class McSAS(AlgorithmBase):
             nt = 0
             # do that MC thing! 
             convergence = inf
-            while convergence > self.convergenceCriterion():
+            while convergence > convergenceCriterion:
                 if nt > self.maxRetries():
                     # this is not a coincidence.
                     # We have now tried maxRetries+2 times
@@ -235,7 +241,7 @@ class McSAS(AlgorithmBase):
                                 numContribs, 
                                 outputMeasVal = True, outputDetails = True,
                                 nRun = nr)
-                if not any([isActiveFitParam(p) for p in self.model.params()]):
+                if not hasActiveParams:
                     break # nothing active, nothing to fit
                 if self.stop:
                     logging.warning("Stop button pressed, exiting...")
@@ -312,11 +318,19 @@ class McSAS(AlgorithmBase):
                 mb = min(param.activeRange())
                 if mb == 0: # FIXME: compare with EPS eventually?
                     mb = pi / (data.x0.limit[1])
-                rset[:, idx] = numpy.ones(numContribs) * mb * .5
+                rset[:, idx] = mb * .5
         else:
             rset = self.model.generateParameters(numContribs)
-
-        modelData = self.model.calc(data, rset, compensationExponent)
+        # models supporting it evaluate in the precision of the parameters
+        dtype = numpy.float64
+        if self.singlePrecision():
+            dtype = numpy.float32
+        rset = rset.astype(dtype)
+
+        # keep the intensity of each contribution, a move replaces one row
+        contribInt = numpy.zeros((numContribs, data.f.binnedData.size))
+        modelData = self.model.calc(data, rset, compensationExponent,
+                                    intensities = contribInt)
         ft, vset, wset, sset = (modelData.cumInt, modelData.vset,
                                 modelData.wset, modelData.sset)
         if any(array(rset.shape) == 0): # no active params, just return model intensity
@@ -336,10 +350,7 @@ class McSAS(AlgorithmBase):
         # weights which is << 1 (for SAXS, usually it's the sum
         # of the scatterers volumes), though increasing ft and reducing the
         # scaling sc[0]; when histogramming, this gets reverted
-        sc, conval, dummy, dummy2 = bgScalingFit.calc(data, modelData, sc,
-                                                      ver = 1)
-        # reoptimize with V2, there might be a slight discrepancy in the
-        # residual definitions of V1 and V2 which would prevent optimization.
+        # the default fit is exact, no simplex pre-optimization needed
         sc, conval, dummy, dummy2 = bgScalingFit.calc(data, modelData, sc)
         logging.info("Initial Chi-squared value: {0}".format(conval))
 
@@ -349,26 +360,44 @@ class McSAS(AlgorithmBase):
         numMoves, numIter, lastUpdate = 0, 0, 0
         # running variable indicating which contribution to change
         ri = 0
-        ftest = None
+        ftest = numpy.empty_like(ft) # reused for each move
+        wsum = wset.sum() # updated with each accepted move
+        # loop invariants, looked up once instead of for every move
+        convergenceCriterion = self.convergenceCriterion()
+        maxIterations = self.maxIterations.value()
+        generateParameters, calc = (self.model.generateParameters,
+                                    self.model.calc)
+        logInfo = logging.getLogger().isEnabledFor(logging.INFO)
+        # trial parameters are drawn in batches, a draw for each move costs
+        # more in call overhead than in random numbers
+        trials = numpy.empty((0, rset.shape[1]))
+        ti = 0 # index of the next trial in the batch
         #NOTE: keep track of uncertainties in MC procedure through epsilon
         while (len(wset) > 1 and # see if there is a distribution at all
-               conval > self.convergenceCriterion() and
-               numIter < self.maxIterations.value() and
+               conval > convergenceCriterion and
+               numIter < maxIterations and
                not self.stop):
-            rt = self.model.generateParameters()
+            if ti == len(trials):
+                trials = generateParameters(self._trialBatchSize).astype(dtype)
+                ti = 0
+            rt = trials[ti:ti + 1]
+            ti += 1
             # calculate contribution measVal:
-            newModelData = self.model.calc(data, rt, compensationExponent)
+            newModelData = calc(data, rt, compensationExponent)
             # Calculate new total measVal, subtract old measVal, add new:
-            oldModelData = self.model.calc(data, rset[ri].reshape((1, -1)),
-                                               compensationExponent)
+            # is numerically stable (so far). Can calculate final uncertainty
+            # based on number of valid "moves" and sys.float_info.epsilon
+            numpy.subtract(ft, contribInt[ri], out = ftest)
+            ftest += newModelData.cumInt
+            # model data keeps a copy, the buffer can be reused
+            # volumes and surfaces of the trial set are not used, passing
+            # those of the new contribution avoids copying all of them
             testModelData = self.model.getModelData(
-                # is numerically stable (so far). Can calculate final uncertainty
-                # based on number of valid "moves" and sys.float_info.epsilon
-                ft - oldModelData.cumInt + newModelData.cumInt,
-                vset,
+                ftest,
+                newModelData.vset,
                 # not as intended but sufficient for now
-                wset.sum() - wset[ri] + newModelData.wset,
-                sset) # surface from testModelData is not used
+                wsum - wset[ri] + newModelData.wset,
+                newModelData.sset, numParams = newModelData.numParams)
 #            ftest = (ft - oldModelData.cumInt + newModelData.cumInt)
 #            wtest = wset.sum() - wset[ri] + newModelData.wset
             # optimize measVal and calculate convergence criterium
@@ -379,14 +408,17 @@ class McSAS(AlgorithmBase):
             if convalt < conval: # it's better
                 # replace current settings with better ones
                 rset[ri], sc, conval = rt, sct, convalt
+                wsum = testModelData.wset[0]
                 ft, wset[ri] = testModelData.cumInt, newModelData.wset
+                contribInt[ri] = newModelData.cumInt
                 # updating unused data for completeness as well
                 vset[ri], sset[ri] = newModelData.vset, newModelData.sset
-                logging.info("rep {rep}/{reps}, good iter {it}: "
-                             "Chisqr= {cs:f}/{conv:.2f}, aGoFs= {opt}\r"
-                             .format(it = numIter, cs = conval,
-                                 conv = self.convergenceCriterion(), rep = nRun+1,
-                                 reps = self.numReps(), opt = aGoFs))
+                if logInfo: # skip formatting the message otherwise
+                    logging.info("rep {rep}/{reps}, good iter {it}: "
+                                 "Chisqr= {cs:f}/{conv:.2f}, aGoFs= {opt}\r"
+                                 .format(it = numIter, cs = conval,
+                                     conv = convergenceCriterion, rep = nRun+1,
+                                     reps = self.numReps(), opt = aGoFs))
                 numMoves += 1
 
             if time.time() - lastUpdate > 0.25:
@@ -421,7 +453,11 @@ class McSAS(AlgorithmBase):
             'numMoves': numMoves,
             'elapsed': elapsed})
 
-        modelData = self.model.getModelData(ft, vset, wset, sset)
+        if dtype is numpy.float64:
+            modelData = self.model.getModelData(ft, vset, wset, sset)
+        else: # final result in full precision
+            rset = rset.astype(numpy.float64)
+            modelData = self.model.calc(data, rset, compensationExponent)
         sc, conval, ifinal, dummy = bgScalingFit.calc(data, modelData, sc)
         details.update({'scaling': sc[0], 'background': sc[1]})
 
@@ -520,24 +556,17 @@ class McSAS(AlgorithmBase):
 
         # volume fraction for each contribution
         volumeFraction = zeros((numContribs, numReps))
-        # number fraction for each contribution
-        numberFraction = zeros((numContribs, numReps))
-        volSqrFraction = zeros((numContribs, numReps)) # aka intensity
-        surfaceFraction = zeros((numContribs, numReps))
-        # volume frac. for each histogram bin
-        minReqVol = zeros((numContribs, numReps)) 
-        # number frac. for each histogram bin
-        minReqNum = zeros((numContribs, numReps))
-        minReqVolSqr = zeros((numContribs, numReps))
-        minReqSurface = zeros((numContribs, numReps))
-        totalVolumeFraction = zeros((numReps))
-        totalNumberFraction = zeros((numReps))
-        totalVolSqrFraction = zeros((numReps))
-        totalSurfaceFraction = zeros((numReps))
+        # volumes, surfaces and the minimum required volume fraction
+        # for each contribution
+        volumes = zeros((numContribs, numReps))
+        surfaces = zeros((numContribs, numReps))
+        minReqVol = zeros((numContribs, numReps))
         # MeasVal scaling factors for matching to the experimental
         # scattering pattern (Amplitude A and flat background term b,
         # defined in the paper)
         scalingFactors = zeros((2, numReps))
+        # repetitions providing model intensities
+        evaluated = zeros(numReps, dtype = bool)
 
         # data, store it in result too, enables to postprocess later
         # store the model instance too
@@ -545,63 +574,62 @@ class McSAS(AlgorithmBase):
         bgScalingFit = BackgroundScalingFit(self.findBackground.value(),
                                             self.positiveBackground.value(),
                                             self.model)
-        # calc vol/num fraction and scaling factors for each repetition
+        # the parameter sets of each repetition in one contiguous block each
+        repContribs = numpy.ascontiguousarray(contribs.transpose((2, 0, 1)))
+        # intensity of each contribution and its relation to the
+        # uncertainties, reused for each repetition
+        contribInt = zeros((numContribs, data.f.binnedData.size))
+        ratio = numpy.empty_like(contribInt)
+        # calc vol fraction and scaling factors for each repetition
         for ri in range(numReps):
-            rset = contribs[:, :, ri] # single set of R for this calculation
-            # compensated volume for each sphere vset:
-            modelData = self.model.calc(data, rset, self.compensationExponent())
-            if not len(modelData.cumInt):
+            rset = repContribs[ri] # single set of R for this calculation
+            result = self._histogramRepetition(data, rset, bgScalingFit,
+                                               contribInt, ratio)
+            if result is None:
                 continue
-            ## TODO: same code than in mcfit pre-loop around line 1225 ff.
-            # initial guess for the scaling factor.
-            sc = numpy.array([data.f.limit[1] / modelData.chisqrInt.max(), data.f.limit[0]])
-            # optimize scaling and background for this repetition
-            sc, conval, dummy, dummy2 = bgScalingFit.calc(data, modelData, sc)
+            sc, modelData, minReqVol[:, ri] = result
             scalingFactors[:, ri] = sc # scaling and bgnd for this repetition.
             # calculate individual volume fractions:
             # here, the weight reverts intensity normalization effecting the
             # scaling sc[0] during optimization, it does not influence
             # the resulting volFrac
             volumeFraction[:, ri] = modelData.volumeFraction(sc[0])
-            totalVolumeFraction[ri] = sum(volumeFraction[:, ri])
-            numberFraction[:, ri] = volumeFraction[:, ri]/modelData.vset.flatten()
-            totalNumberFraction[ri] = sum(numberFraction[:, ri])
-            volSqrFraction[:, ri] = volumeFraction[:, ri]*modelData.vset.flatten()
-            totalVolSqrFraction[ri] = sum(volSqrFraction[:, ri])
-            surfaceFraction[:, ri] = numberFraction[:, ri]*modelData.sset.flatten()
-            totalSurfaceFraction[ri] = sum(surfaceFraction[:, ri])
-
-            # calc observability for each sphere/contribution
-            for c in range(numContribs):
-                # observability: the maximum contribution for
-                # that sphere to the total scattering pattern
-                # NOTE: no need to compensate for p_c here, we work with
-                # volume fraction later which is compensated by default.
-                # additionally, we actually do not use this value.
-                # again, partial intensities for this size only required
-                partialModelData = self.model.calc(data, rset[c].reshape((1, -1)),
-                                                   self.compensationExponent())
-                # dividing by zero tends to go towards infinity,
-                # when chosing the minimum those can be ignored
-                weightedInt = data.f.binnedDataU * volumeFraction[c, ri]
-                partialCumIntScaled = sc[0] * partialModelData.chisqrInt
-                indices = (partialCumIntScaled != 0.)
-                minReqVol[c, ri] = (
-                    weightedInt[indices] / partialCumIntScaled[indices]).min()
-                minReqNum[c, ri] = minReqVol[c, ri] / modelData.vset[c]
-                minReqVolSqr[c, ri] = (minReqNum[c, ri]
-                        * minReqVol[c, ri] * minReqVol[c, ri])
-                minReqSurface[c, ri] = (minReqNum[c, ri] * modelData.sset[c])
-
-            if 0 != totalNumberFraction[ri]:
-                numberFraction[:, ri] /= totalNumberFraction[ri]
-                minReqNum[:, ri]      /= totalNumberFraction[ri]
-            if 0 != totalVolSqrFraction[ri]:
-                volSqrFraction[:, ri] /= totalVolSqrFraction[ri]
-                minReqVolSqr[:, ri]   /= totalVolSqrFraction[ri]
-            if 0 != totalSurfaceFraction[ri]:
-                surfaceFraction[:, ri] /= totalSurfaceFraction[ri]
-                minReqSurface[:, ri]   /= totalSurfaceFraction[ri]
+            volumes[:, ri] = modelData.vset
+            surfaces[:, ri] = modelData.sset
+            evaluated[ri] = True
+
+        # the other fractions of all evaluated repetitions at once
+        # number fraction for each contribution
+        numberFraction = zeros((numContribs, numReps))
+        volSqrFraction = zeros((numContribs, numReps)) # aka intensity
+        surfaceFraction = zeros((numContribs, numReps))
+        # number frac. for each histogram bin
+        minReqNum = zeros((numContribs, numReps))
+        minReqVolSqr = zeros((numContribs, numReps))
+        minReqSurface = zeros((numContribs, numReps))
+        ev = numpy.flatnonzero(evaluated)
+        volFrac, vol, surf = (volumeFraction[:, ev], volumes[:, ev],
+                              surfaces[:, ev])
+        numberFraction[:, ev] = volFrac / vol
+        volSqrFraction[:, ev] = volFrac * vol
+        surfaceFraction[:, ev] = numberFraction[:, ev] * surf
+        minReqNum[:, ev] = minReqVol[:, ev] / vol
+        # the squared volume fraction is the number times the volume
+        # fraction squared
+        minReqVolSqr[:, ev] = (minReqVol[:, ev] * minReqVol[:, ev]
+                               * minReqNum[:, ev])
+        minReqSurface[:, ev] = minReqNum[:, ev] * surf
+
+        # normalize the fractions of all repetitions by their totals at once,
+        # except for those without any
+        for fraction, minReq in (
+                (numberFraction, minReqNum),
+                (volSqrFraction, minReqVolSqr),
+                (surfaceFraction, minReqSurface)):
+            total = fraction.sum(axis = 0)
+            nonzero = (total != 0)
+            fraction[:, nonzero] /= total[nonzero]
+            minReq[:, nonzero]   /= total[nonzero]
 
         fractions = dict(vol = (volumeFraction, minReqVol),
                          num = (numberFraction, minReqNum),
@@ -614,13 +642,52 @@ class McSAS(AlgorithmBase):
         for paramIndex, param in enumerate(self.model.activeParams()):
             param.histograms().calc(contribs, paramIndex, fractions) # new method
 
+    def _histogramRepetition(self, data, rset, bgScalingFit,
+                             contribInt, ratio):
+        """Evaluates the model for the contributions *rset* of a single
+        repetition and fits it to the data. Returns the scaling factors,
+        the model data and, for each contribution, the minimum volume
+        fraction required to be observable. It is infinite for
+        contributions without any intensity. Returns None if there is no
+        model intensity. Depends on the given repetition only, the arrays
+        *contribInt* and *ratio* serve as work buffers."""
+        # compensated volume for each sphere vset:
+        # keeping the partial intensity of each contribution as well
+        modelData = self.model.calc(data, rset, self.compensationExponent(),
+                                    intensities = contribInt)
+        if not len(modelData.cumInt):
+            return None
+        ## TODO: same code than in mcfit pre-loop around line 1225 ff.
+        # initial guess for the scaling factor.
+        sc = numpy.array([data.f.limit[1] / modelData.chisqrInt.max(), data.f.limit[0]])
+        # optimize scaling and background for this repetition
+        sc, conval, dummy, dummy2 = bgScalingFit.calc(data, modelData, sc)
+        # calc observability for all spheres/contributions at once
+        # observability: the maximum contribution for
+        # that sphere to the total scattering pattern
+        # NOTE: no need to compensate for p_c here, we work with
+        # volume fraction later which is compensated by default.
+        # additionally, we actually do not use this value.
+        # dividing by zero tends to go towards infinity,
+        # when chosing the minimum those can be ignored
+        with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+            numpy.divide(data.f.binnedDataU, contribInt, out = ratio)
+        ratio[contribInt == 0.] = inf
+        # min(U * volFrac / (sc * I)) of each contribution, the scaling
+        # cancels out as volFrac = sc * wset / vset; this keeps its sign from
+        # turning minima into maxima and is defined for zero scaling as well
+        minReqVol = ratio.min(axis = 1)
+        minReqVol *= modelData.wset / modelData.vset
+        return sc, modelData, minReqVol
+
     def gen2DMeasVal(self):
         """
         This function is optionally run after the histogram procedure for
         anisotropic images, and will calculate the MC fit measVal in
         image form
         """
-        contribs = self.result[0]['contribs']
+        result = self.result[0]
+        contribs = result['contribs']
         numContribs, dummy, numReps = contribs.shape
 
         # load original Dataset
@@ -631,24 +698,24 @@ class McSAS(AlgorithmBase):
 
         logging.info("Recalculating 2D measVal, please wait")
         # for each Result
-        intAvg = zeros(shape(x0))
+        repInt = zeros((numReps, x0.size))
         # TODO: for which parameter?
-        scalingFactors = self.result[0]['scalingFactors']
+        scalingFactors = result['scalingFactors']
         for ri in range(numReps):
             logging.info('regenerating set {} of {}'.format(ri, numReps-1))
             rset = contribs[:, :, ri]
             # calculate their form factors
             # ft, vset, wset = self.model.calc(data, rset, compensationExponent)
             modelData = self.model.calc(data, rset, compensationExponent)
-            # Optimize the intensities and calculate convergence criterium
-            intAvg = (intAvg + modelData.chisqrInt*scalingFactors[0, ri]
-                             + scalingFactors[1, ri])
+            repInt[ri] = modelData.chisqrInt
+        # Scaled intensities of all repetitions summed up in one product
+        intAvg = scalingFactors[0].dot(repInt) + scalingFactors[1].sum()
         # print "Initial conval V1", Conval1
         intAvg /= numReps
         # mask (lifted from clipDataset)
         intAvg = intAvg[data.x0.validIndices]
         # shape back to imageform
-        self.result[0]['measVal2d'] = reshape(intAvg, kansas)
+        result['measVal2d'] = reshape(intAvg, kansas)
 
     def plot(self, axisMargin = 0.3,
              outputFilename = None, autoClose = False):
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# mcsas/mcsas_test.py
+
+import numpy
+from numpy.testing import assert_allclose, assert_array_equal
+
+from ..bases.algorithm import seedRandomGenerator
+from ..dataobj import SASData
+from ..models.sphere import Sphere
+from .mcsas import McSAS
+
+class SilentSphere(Sphere):
+    """Sphere model without any intensity for one of the radii."""
+    silentRadius = 42e-9
+
+    def calcIntensities(self, data, columns, compensationExponent = None):
+        result = super(SilentSphere, self).calcIntensities(
+                data, columns, compensationExponent = compensationExponent)
+        result[0][columns[0] == self.silentRadius] = 0.
+        return result
+
+class FixedScaling(object):
+    """Background scaling fit which provides a predefined scaling."""
+    def __init__(self, scaling):
+        self.scaling = scaling
+
+    def calc(self, data, modelData, sc):
+        return numpy.array((self.scaling, 0.)), 1., modelData.chisqrInt, 1.
+
+def getAlgorithm():
+    q = numpy.logspace(-2, 0, 100) * 1e9
+    intensity = 1. / (1. + (q * 1e-8)**4)
+    data = SASData(title = "test", rawArray = numpy.vstack(
+                    (q * 1e-9, intensity, intensity * 0.01)).T)
+    algo = McSAS.factory()()
+    algo.model = SilentSphere()
+    algo.data = data
+    return algo
+
+def directMinReqVol(algo, rset, scaling):
+    """The minimum required volume fraction of each contribution,
+    min(U * volFrac / (sc * I)), by evaluating each one separately."""
+    data, compExp = algo.data, algo.compensationExponent()
+    modelData = algo.model.calc(data, rset, compExp)
+    volFrac = modelData.volumeFraction(scaling)
+    result = numpy.empty(len(rset))
+    for c in range(len(rset)):
+        partial = algo.model.calc(data, rset[c:c+1], compExp)
+        scaled = scaling * partial.chisqrInt
+        valid = (scaled != 0.)
+        if not valid.any(): # never observable
+            result[c] = numpy.inf
+            continue
+        result[c] = (data.f.binnedDataU[valid] * volFrac[c]
+                     / scaled[valid]).min()
+    return result
+
+def testMinReqVol():
+    algo = getAlgorithm()
+    data = algo.data
+    rset = numpy.array((5e-9, 20e-9, SilentSphere.silentRadius, 80e-9)
+                      ).reshape((-1, 1))
+    contribInt = numpy.zeros((len(rset), data.f.binnedData.size))
+    ratio = numpy.empty_like(contribInt)
+    reference = directMinReqVol(algo, rset, 1.)
+    assert numpy.isinf(reference[2]) and numpy.isfinite(reference).sum() == 3
+    for scaling in (3.5, -3.5):
+        assert_allclose(directMinReqVol(algo, rset, scaling), reference,
+                        rtol = 1e-12)
+    # the same for zero scaling: the scaling cancels out
+    for scaling in (3.5, -3.5, 0.):
+        sc, modelData, minReqVol = algo._histogramRepetition(
+                data, rset, FixedScaling(scaling), contribInt, ratio)
+        assert sc[0] == scaling
+        assert_allclose(minReqVol, reference, rtol = 1e-12)
+
+def testSeededParameters():
+    model = Sphere()
+    seedRandomGenerator(1234)
+    first = model.generateParameters(50)
+    seedRandomGenerator(1234)
+    assert_array_equal(model.generateParameters(50), first)
+    seedRandomGenerator(4321)
+    assert (model.generateParameters(50) != first).any()
+
+def testSeededCalc():
+    contribs = []
+    for dummy in range(2):
+        algo = getAlgorithm()
+        algo.numContribs.setValue(20)
+        algo.numReps.setValue(2)
+        algo.maxIterations.setValue(200)
+        algo.showIncomplete.setValue(True)
+        algo.calc(seed = 1234)
+        contribs.append(algo.result[0]['contribs'])
+    assert_array_equal(contribs[0], contribs[1])
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
@@ -45,6 +45,10 @@ class ExtendedEncoder(json.JSONEncoder):
 
         return json.JSONEncoder.default(self, obj)
 
+# parameter classes by their type names in the parameter definition file
+_parameterClasses = dict(int = ParameterNumerical, float = ParameterFloat,
+                         bool = ParameterBoolean, str = ParameterString)
+
 class cInfo(object):
     """
     This class contains all the information required to read, verify and write
@@ -52,6 +56,8 @@ class cInfo(object):
     """
     parameters=None
     parameterNames=list()
+    # parsed parameter definition files by path and modification time
+    _parDictCache = dict()
 
     def __init__(self,**kwargs):
         """initialise the defaults and populate the database with values
@@ -84,9 +90,13 @@ class cInfo(object):
         parameters to self.parameters
         Can also be used to update existing parameters from supplied filename
         """
-        with mcopen(fname, 'r') as jfile:
-            logging.info('loading parameters from file: {}'.format(fname))
-            parDict = json.load(jfile)
+        key = (os.path.abspath(fname), os.path.getmtime(fname))
+        parDict = cInfo._parDictCache.get(key)
+        if parDict is None:
+            with mcopen(fname, 'r') as jfile:
+                logging.info('loading parameters from file: {}'.format(fname))
+                parDict = json.load(jfile)
+            cInfo._parDictCache[key] = parDict
 
         if self.parameters is None:
             # create if it does not exist yet
@@ -94,7 +104,8 @@ class cInfo(object):
 
         # now we cast this information into the Parameter class:
         for kw in list(parDict.keys()):
-            subDict = parDict[kw]
+            # keep the cached definitions untouched
+            subDict = dict(parDict[kw])
             name = kw
             value = subDict.pop("value", None)
             default = subDict.pop("default", None)
@@ -102,14 +113,8 @@ class cInfo(object):
                 value = default
             # determine parameter class:
             cls = subDict.pop("cls", None)
-            if cls == "int":
-                subDict.update(cls = ParameterNumerical)
-            elif cls == "float":
-                subDict.update(cls = ParameterFloat)
-            elif cls == "bool": 
-                subDict.update(cls = ParameterBoolean)
-            elif cls == "str": 
-                subDict.update(cls = ParameterString)
+            if cls in _parameterClasses:
+                subDict.update(cls = _parameterClasses[cls])
             else:
                 logging.warning('parameter type {} for parameter {} not '
                                 ' understood from {}'.format(cls, kw, fname))
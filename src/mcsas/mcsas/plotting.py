@@ -33,7 +33,6 @@ from ..dataobj import SASData
 #    matplotlib.rcParams['backend'] = 'WebAgg'
 
 import matplotlib.font_manager as fm
-from matplotlib import gridspec
 from matplotlib.pyplot import (figure, xticks, yticks, errorbar, bar,
         text, plot, grid, legend, title, xlim, ylim, sca, gca, axis,
         close, colorbar, imshow, subplot, axes, show, savefig,
@@ -41,6 +40,12 @@ from matplotlib.pyplot import (figure, xticks, yticks, errorbar, bar,
 
 PM = u"\u00B1"
 
+def isInteractiveBackend():
+    """Returns False for backends rendering to files only, such as Agg
+    in batch runs, which do not need any window setup."""
+    return matplotlib.get_backend().lower() not in (
+            'agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template')
+
 def getTextSize(fig, fontProps):
     """Returns the width and height of a character for the given font setup.
     This can be different on each platform.
@@ -174,8 +179,13 @@ class PlotResults(object):
         self._fig, self._ah = self.figInit(self._nHists, 
                 self._figureTitle, self._nR)
 
+        # histograms and axes layout do not change between ranges
+        histograms = self._modelData.get('histograms', ())
+        numCols = self._nHists + 1
         # show all ranges:
         for rangei in range(self._nR):
+            # index of the first axes of this range
+            rowOffset = rangei * 2 * numCols
             
             #plot measVal fit:
             if dataset.is2d:
@@ -188,29 +198,28 @@ class PlotResults(object):
 
             else:
                 # 1D data
-                qAxis = self._ah[rangei * 2 * (self._nHists + 1) 
-                    + self._nHists + 1]
+                qAxis = self._ah[rowOffset + numCols]
                 fitX0 = self._result['fitX0']
                 fitMeasVal = self._result['fitMeasValMean'][0,:]
                 if isinstance(dataset, SASData):
-                    fitX0 = np.sort(self._result['fitX0'])
-                    fitMeasVal = self._result['fitMeasValMean'][0, 
-                            np.argsort(self._result['fitX0'])]
+                    order = np.argsort(fitX0)
+                    fitX0 = fitX0[order]
+                    fitMeasVal = fitMeasVal[order]
                 self.plot1D(dataset,
                         fitX0, fitMeasVal, qAxis)
 
             ## Information on the settings can be shown here:
-            InfoAxis = self._ah[rangei * 2 * (self._nHists + 1)]
+            InfoAxis = self._ah[rowOffset]
             # make active:
             self.plotInfo(InfoAxis)
             sca(InfoAxis)
 
             # plot histograms
             # https://stackoverflow.com/a/952952
-            for hi, parHist in enumerate(self._modelData.get('histograms', ())):
+            for hi, parHist in enumerate(histograms):
                 plotPar = parHist.param
                 # prep axes:
-                hAxis = self._ah[hi + (self._nHists + 1) + 1]
+                hAxis = self._ah[rowOffset + numCols + hi + 1]
 
                 # plot partial contribution in qAxis
                 # not yet available, need to find partial intensities:
@@ -221,7 +230,7 @@ class PlotResults(object):
                 self.plotHist(plotPar, parHist, hAxis, rangei)
 
                 # put the rangeInfo in the plot above
-                InfoAxis = self._ah[hi + 1]
+                InfoAxis = self._ah[rowOffset + hi + 1]
                 self.plotStats(parHist, rangei, self._fig, InfoAxis)
 
         # check current figure size, might change due to screen size (?)
@@ -236,21 +245,24 @@ class PlotResults(object):
                                 None, "plot PDF", extension = '.pdf'),
                               dpi = 300)
         except AttributeError: pass
-        # trigger plot window popup
-        manager = get_current_fig_manager()
-        manager.canvas.draw()
-        manager.show() # resizes large windows to screen width by default
-        # resize slightly to update figure to window size,
-        # Windows&MacOS need this, just do it on Linux as well
-        # somehow, left&right ylabel moves out of the window on windows (FIXME)
-        manager.resize(int(targetWidth*1.005), int(targetHeight*1.005))
+        interactive = isInteractiveBackend()
+        if interactive:
+            # trigger plot window popup
+            manager = get_current_fig_manager()
+            manager.canvas.draw()
+            manager.show() # resizes large windows to screen width by default
+            # resize slightly to update figure to window size,
+            # Windows&MacOS need this, just do it on Linux as well
+            # somehow, left&right ylabel moves out of the window on windows (FIXME)
+            manager.resize(int(targetWidth*1.005), int(targetHeight*1.005))
 
         if queue is not None:
             queue.put(True) # queue not empty means: plotting done here
-        # show() seems to be nescessary otherwise the plot window is
-        # unresponsive/hangs on Ubuntu or the whole program crashes on windows
-        # 'python stopped working'
-        show() # this is synchronous on Linux, waits here until the window is closed
+        if interactive:
+            # show() seems to be nescessary otherwise the plot window is
+            # unresponsive/hangs on Ubuntu or the whole program crashes on windows
+            # 'python stopped working'
+            show() # this is synchronous on Linux, waits here until the window is closed
         if autoClose:
             close(self._fig)
 
@@ -327,7 +339,7 @@ class PlotResults(object):
         return ah
 
     def figInit(self, nHists, figureTitle, nR = 1):
-        """initialize figure and initialise axes using GridSpec.
+        """initialize figure and initialise axes on a grid.
         Each rangeinfo (nR) contains two rows and nHists + 1 columns.
         the top row axes are for placing text objects: settings and stats.
         The bottom row axes are for plotting the fits and the histograms
@@ -347,14 +359,13 @@ class PlotResults(object):
                                  charHeight / (cellHeight * fig.dpi))
         self._charHeight = charHeight
         self._charWidth = charWidth
-        gs = gridspec.GridSpec(2 * numRows, numCols,
-                height_ratios = np.tile([1,6], numRows))
         # update margins
         self._subPlotPars = dict(
                 left  =    charWidth*11./numCols, bottom =    charHeight*4.,
                 right = 1.-charWidth* 7./numCols, top    = 1.-charHeight*1.5,
                 wspace =   charWidth*20.,         hspace =    charHeight*12.)
-        gs.update(**self._subPlotPars)
+        gridSpec = dict(height_ratios = np.tile([1,6], numRows),
+                        **self._subPlotPars)
 
         textAxDict = {
                 'frame_on' : False,
@@ -363,9 +374,10 @@ class PlotResults(object):
                 'ylim' : [0., 1.],
                 'xlim' : [0., 1.],
                 }
-        for ai in range(numCols * numRows * 2 ):
-            # initialise axes
-            ah = subplot(gs[ai])
+        # initialise all axes at once, ordered from top left to bottom right
+        for ai, ah in enumerate(fig.subplots(2 * numRows, numCols,
+                                             squeeze = False,
+                                             gridspec_kw = gridSpec).flat):
             # disable mouse coordinates while avoiding Tkinter error
             # about None not being callable
             ah.format_coord = lambda x, y: ""
@@ -446,14 +458,15 @@ class PlotResults(object):
                        **self._errorBarOpts)
         self.plotGrid(qAxis)
         # plot fit data
-        qAxis.plot(dataset.x0.unit.toDisplay(fitX0),
+        fitX0 = dataset.x0.unit.toDisplay(fitX0)
+        qAxis.plot(fitX0,
                    dataset.f.unit.toDisplay(fitMeasVal),
                    'r-', lw = 3, zorder = 4,
                    label = u"MC Fit {name}"
                             .format(name = dataset.f.name))
         try: # try to plot the background level
-            qAxis.plot(dataset.x0.unit.toDisplay(fitX0),
-                       np.ones_like(fitX0) * dataset.f.unit.toDisplay(self._BG[0]),
+            qAxis.plot(fitX0,
+                       np.full_like(fitX0, dataset.f.unit.toDisplay(self._BG[0])),
                        'g-', linewidth = 3, zorder = 3,
                        label = "MC Background level:\n"
                                "        ({0:03.3g})".format(self._BG[0]))
@@ -492,7 +505,6 @@ class PlotResults(object):
         ovString = self.formatAlgoInfo()
         delta = 0.001 # minor offset
         tvObj = text(0. - delta, 0. + delta, ovString, **self._infoText)
-        self._fig.show()
         axis('tight')
 
     def plotStats(self, parHist, rangei, fig, InfoAxis):
@@ -504,7 +516,6 @@ class PlotResults(object):
         ovString = self.formatRangeInfo(parHist, rangei, weighti = 0)
         tvObj = text(0. - delta, 0. + delta, ovString, bbox = 
                 {'facecolor' : 'white', 'alpha': 0.95}, **self._infoText)
-        fig.show()
         axis('tight')
 
     def plotHist(self, plotPar, parHist, hAxis, rangei):
@@ -526,14 +537,15 @@ class PlotResults(object):
         xLabel = u'{} ({})'.format(plotPar.name(), plotPar.suffix())
 
         # expand the x axis to leave a little more space left and right of the plot
+        xMin, xMax = histXLowerEdge.min(), histXLowerEdge.max()
         if parHist.xscale == 'log':
-            xLim = (histXLowerEdge.min() * (1 - self._axisMargin), 
-                    histXLowerEdge.max() * (1 + self._axisMargin))
+            xLim = (xMin * (1 - self._axisMargin),
+                    xMax * (1 + self._axisMargin))
             xScale = 'log'
         else:
-            xDiff = histXLowerEdge.max() - histXLowerEdge.min()
-            xLim = (histXLowerEdge.min() - 0.25 * self._axisMargin * xDiff, 
-                    histXLowerEdge.max() + 0.25 * self._axisMargin * xDiff) 
+            xDiff = xMax - xMin
+            xLim = (xMin - 0.25 * self._axisMargin * xDiff,
+                    xMax + 0.25 * self._axisMargin * xDiff)
             xScale = 'linear'
 
         # vertical limits also should be adjusted a little
@@ -571,12 +583,13 @@ class PlotResults(object):
 
         # fill axes
         # plot active histogram:
-        validi = ( (histXLowerEdge >= plotPar.toDisplay(parHist.lower)) * 
+        validi = ( (histXLowerEdge >= plotPar.toDisplay(parHist.lower)) &
                    (histXLowerEdge <= plotPar.toDisplay(parHist.upper)) )
-        validi[-1] = 0
-        if not (validi.sum()==0):
-            hAxis.bar(histXLowerEdge[validi], HistYMean[validi[0:-1]], 
-                    width = histXWidth[validi[0:-1]], color = 'orange',
+        validi[-1] = False
+        validBins = validi[0:-1] # for values of bins, without the last edge
+        if validi.any():
+            hAxis.bar(histXLowerEdge[validi], HistYMean[validBins],
+                    width = histXWidth[validBins], color = 'orange',
                     edgecolor = 'black', linewidth = 1, zorder = 2,
                     align = "edge", # align bar by left edge
                     label = 'MC size histogram')
@@ -588,8 +601,8 @@ class PlotResults(object):
                        ms = 5, markeredgecolor = 'r',
                        label = 'Minimum visibility limit', zorder = 3)
         # plot active uncertainties
-        hAxis.errorbar(histXMean[validi[0:-1]], HistYMean[validi[0:-1]], 
-            HistYStd[validi[0:-1]],
+        hAxis.errorbar(histXMean[validBins], HistYMean[validBins],
+            HistYStd[validBins],
                 zorder = 4, **self._errorBarOpts)
         legendHandle0, legendLabel0 = hAxis.get_legend_handles_labels()
         legendHandle1, legendLabel1 = suppAx.get_legend_handles_labels()
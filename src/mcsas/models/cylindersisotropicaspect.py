@@ -2,7 +2,7 @@
 # models/cylinders.py
 
 import numpy, scipy, scipy.special
-from numpy import pi, zeros, sin, cos, sqrt, newaxis
+from numpy import pi, zeros, sin, cos, sqrt
 
 from mcsas.utils.parameter import FitParameter, Parameter
 from mcsas.bases.model import SASModel
@@ -65,8 +65,9 @@ class CylindersIsotropic(SASModel):
         #fsplit=( 2*scipy.special.j1(qRsina)/qRsina * sin(qLcosa)/qLcosa )*sqrt((sin((psi-psiA)*dToR))[newaxis,:]%180+0*qRsina)
         qRsina = numpy.outer(dataset.q, self.radius() * sin((psi * dToR) % 180.))
         qLcosa = numpy.outer(dataset.q, self.radius() * self.aspect() * cos((psi * dToR) % 180.))
+        # the angular factor broadcasts along q
         fsplit = ((2*scipy.special.j1(qRsina)/qRsina * sin(qLcosa)/qLcosa)
-                  * sqrt((sin(psi * dToR))[newaxis,:]%180 + 0. * qRsina))
+                  * sqrt(sin(psi * dToR) % 180))
         #integrate over orientation
         return numpy.sqrt(numpy.mean(fsplit**2, axis=1)) #should be length q
 
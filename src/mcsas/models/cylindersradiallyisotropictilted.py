@@ -77,27 +77,29 @@ class CylindersRadiallyIsotropicTilted(SASModel):
 
         # rotation can be used to get slightly better results, but
         # ONLY FOR RADIAL SYMMETRY, NOT SPHERICAL.
-        fcyl = 0.
-        for pIdx in range(len(phiCtr)):
-            # TODO: Implementing from equations 3.263 in SASfit manual
-            # leave the cylinder axis arbitrary psi rotation out of it for now.
-            # calculate cos(gamma)
-            # since we do not want to describe theta, we use an angle
-            # omega describing cylinder axis projection in x-z plane (=psi),
-            # combined with
-            # phi describing cylinder axis projection onto x-y plane
-            # theta=omega/cos(phi) (probably)
-            # cosGammaP=sin(psi*dToR)*cos(psi*dToR)*cos(phiCtr[pidX]*dToR)\
-            #         + cos(psi*dToR)*sin(psi*dToR)
-            # cosGammaM=
-            qRsina = numpy.outer(dataset.q, self.radius() * sin(psi * dToR))
-            # approximation for small tilts, adjusts the length of the cylinder only!
-            qLcosa = numpy.outer(dataset.q, self.radius() * self.aspect()
-                                 * cos(phiCtr[pIdx] * dToR) * cos(psi * dToR))
-
-            fsplit = (2. * scipy.special.j1(qRsina)/qRsina * sinc(qLcosa / pi))
-            # integrate over orientation
-            fcyl += numpy.sqrt(numpy.mean(fsplit**2, axis=1)) / len(phiCtr) # should be length q
+        # TODO: Implementing from equations 3.263 in SASfit manual
+        # leave the cylinder axis arbitrary psi rotation out of it for now.
+        # calculate cos(gamma)
+        # since we do not want to describe theta, we use an angle
+        # omega describing cylinder axis projection in x-z plane (=psi),
+        # combined with
+        # phi describing cylinder axis projection onto x-y plane
+        # theta=omega/cos(phi) (probably)
+        # cosGammaP=sin(psi*dToR)*cos(psi*dToR)*cos(phiCtr[pidX]*dToR)\
+        #         + cos(psi*dToR)*sin(psi*dToR)
+        # cosGammaM=
+        # the radial part does not depend on the out-of-plane tilt
+        qRsina = numpy.outer(dataset.q, self.radius() * sin(psi * dToR))
+        fRadial = 2. * scipy.special.j1(qRsina) / qRsina
+        # approximation for small tilts, adjusts the length of the cylinder only!
+        # all tilts at once, the last axis of shape (q, psi, phi)
+        qLcosa = (numpy.outer(dataset.q, self.radius() * self.aspect()
+                              * cos(psi * dToR))[:, :, numpy.newaxis]
+                  * cos(phiCtr * dToR))
+        fsplit = fRadial[:, :, numpy.newaxis] * sinc(qLcosa / pi)
+        # integrate over orientation, the tilts are equally probable
+        fcyl = (numpy.sqrt(numpy.mean(fsplit**2, axis = 1)).sum(axis = 1)
+                / len(phiCtr)) # should be length q
 
         return fcyl
 
@@ -8,6 +8,7 @@ from numpy import pi, sin, cos, sqrt
 from mcsas.utils.parameter import FitParameter, Parameter
 from mcsas.bases.algorithm import RandomUniform, RandomExponential
 from mcsas.bases.model import SASModel
+from mcsas.models.sphere import sphereFormfactor
 from mcsas.utils.units import Length, NoUnit, SLD
 
 # parameters must not be inf
@@ -64,8 +65,7 @@ class EllipsoidsIsotropic(SASModel):
 
         intVal = np.linspace(0., pi / 2., self.intDiv())
         
-        qrP = np.outer(q, rPlugin(Ra, Rc, intVal))
-        fsplit = 3.* ( sin(qrP) - qrP * cos (qrP) ) / (qrP**3.) 
+        fsplit = sphereFormfactor(q.reshape((-1, 1)), rPlugin(Ra, Rc, intVal))
         
         # integrate over orientation
         return np.sqrt(np.mean(fsplit**2 * sin(intVal), axis=1)) # should be length q
@@ -8,6 +8,7 @@ import logging
 from mcsas.bases.algorithm import RandomUniform
 from mcsas.utils.parameter import FitParameter, Parameter
 from mcsas.bases.model import SASModel
+from mcsas.models.sphere import sphereFormfactor
 from mcsas.utils.units import Length, Fraction, NoUnit, SLD
 
 class LMADenseSphere(SASModel):
@@ -86,8 +87,7 @@ class LMADenseSphere(SASModel):
             return G
 
 
-        qr = q * self.radius()
-        result = 3. * (sin(qr) - qr * cos(qr)) / (qr**3.)
+        result = sphereFormfactor(q, self.radius())
         #now we introduce the structure factor
         rhsq = 2. * q * (SFmf * self.radius())
         G = SFG(rhsq, SFmu)
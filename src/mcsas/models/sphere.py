@@ -2,13 +2,56 @@
 # models/sphere.py
 
 import numpy
-from numpy import pi, sin, cos
+from numpy import pi
 
 from mcsas.bases.algorithm import RandomUniform
 from mcsas.utils.parameter import FitParameter, Parameter
 from mcsas.bases.model import SASModel
 from mcsas.utils.units import Length, NM, SLD
 
+def sphereFormfactor(q, radius, out = None, work = None):
+    r"""Form factor amplitude of a sphere for the given *q* and *radius*,
+    :math:`3 (sin(qr) - qr \cdot cos(qr)) / (qr)^3`.
+    Sine and cosine are derived from a single tangent of the half angle,
+    :math:`t = tan(qr/2)`, which shares the argument reduction for both:
+    :math:`3 (2t + qr (t^2 - 1)) / ((1 + t^2) (qr)^3)`.
+    For small :math:`qr` the expression suffers from cancellation, there
+    the Taylor series :math:`1 - x/10 + x^2/280 - x^3/15120` with
+    :math:`x = (qr)^2` is used instead.
+    The result is written to *out* and the pair of arrays in *work* holds
+    the intermediates, all are allocated if not provided. They have to match
+    the broadcast shape of *q* and *radius* and determine the precision of
+    the evaluation."""
+    shape = numpy.broadcast(q, radius).shape
+    if work is None:
+        work = numpy.empty(shape), numpy.empty(shape)
+    qr, tmp = work
+    result = out
+    if result is None:
+        result = numpy.empty(shape, dtype = qr.dtype)
+    numpy.multiply(q, radius, out = qr)
+    numpy.multiply(qr, .5, out = tmp)
+    numpy.tan(tmp, out = tmp)
+    numpy.multiply(tmp, tmp, out = result)
+    result -= 1.
+    result *= qr
+    result += tmp
+    result += tmp
+    tmp *= tmp
+    tmp += 1.
+    tmp *= qr
+    tmp *= qr
+    tmp *= qr
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        result /= tmp
+    result *= 3.
+    small = (qr < 0.1)
+    if qr.dtype == numpy.float32:
+        small = (qr < 0.5)
+    qr2 = qr[small]**2
+    result[small] = 1. - qr2 * (1. / 10. - qr2 * (1. / 280. - qr2 / 15120.))
+    return result
+
 class Sphere(SASModel):
     """Form factor of a sphere"""
     shortName = "Sphere"
@@ -25,6 +68,8 @@ class Sphere(SASModel):
                     valueRange = (0., numpy.inf),
                     decimals = 9), )
 
+    _workBuffers = None # form factor work arrays by shape and type
+
     def __init__(self):
         super(Sphere, self).__init__()
         self.radius.setActive(True)
@@ -41,8 +86,8 @@ class Sphere(SASModel):
 
         :math:`v(r) = {4\pi \over 3} r^3`
         """
-        result = (pi*4./3.) * self.radius()**3
-        return result
+        r = self.radius()
+        return (pi*4./3.) * r**3
 
     def absVolume(self):
         r"""Calculates the volume of a sphere taking the scattering length
@@ -57,10 +102,74 @@ class Sphere(SASModel):
 
         :math:`F(q, r) = { 3 ~ sin(qr) - qr \cdot cos(qr) \over (qr)^3 }`
         """
-        q = self.getQ(dataset)
-        qr = q * self.radius() 
-        result = 3. * (sin(qr) - qr * cos(qr)) / (qr**3.)
-        return result
+        return sphereFormfactor(self.getQ(dataset), self.radius())
+
+    def _smearedFormfactors(self, data, radius):
+        """Returns the squared form factors for each radius integrated over
+        the smeared q values of *data*. The contributions are evaluated in
+        blocks limiting the size of the intermediate arrays."""
+        locs = data.locs.astype(radius.dtype, copy = False)
+        integWeights = self.smearingWeights(data)
+        ffSqr = numpy.empty((len(radius), len(locs)))
+        # the form factor and its two intermediate arrays
+        block = max(1, self._batchBytes // (3 * locs.itemsize * locs.size))
+        for start in range(0, len(radius), block):
+            stop = min(start + block, len(radius))
+            ff = sphereFormfactor(locs, radius[start:stop].reshape((-1, 1, 1)))
+            ff *= ff
+            ffSqr[start:stop] = ff.dot(integWeights)
+        return ffSqr
+
+    def calcIntensities(self, data, columns, compensationExponent = None):
+        """Calculates the squared form factors of all contributions at once
+        if the radius is the only active parameter."""
+        # one column per active parameter, avoids collecting them each call
+        if len(columns) != 1 or not self.radius.isActive():
+            return None
+        # the form factor is evaluated in the precision of the parameters,
+        # the weights may exceed the single precision range
+        radius = columns[0]
+        if self.doSmear(data):
+            ffSqr = self._smearedFormfactors(data, radius)
+            return self._intensityWeights(radius, compensationExponent, ffSqr)
+        q = self.getQ(data)
+        qUnique, qInverse = data.uniqueQ()
+        if len(qUnique) == len(q):
+            qInverse = None # no duplicates, use q as is
+        else:
+            q = qUnique
+        q = q.astype(radius.dtype, copy = False)
+        shape = (len(radius), len(q))
+        key = shape, radius.dtype
+        # reuse the intermediate arrays, their size changes rarely
+        if self._workBuffers is None:
+            self._workBuffers = dict()
+        if key not in self._workBuffers:
+            self._workBuffers[key] = (numpy.empty(shape, dtype = radius.dtype),
+                                      numpy.empty(shape, dtype = radius.dtype))
+        ff = sphereFormfactor(q, radius.reshape((-1, 1)),
+                              work = self._workBuffers[key])
+        if qInverse is not None:
+            ff = ff[:, qInverse]
+        ffSqr = ff.astype(numpy.float64, copy = False)
+        ffSqr *= ffSqr
+        return self._intensityWeights(radius, compensationExponent, ffSqr)
+
+    def _intensityWeights(self, radius, compensationExponent, ffSqr):
+        """Completes the squared form factors *ffSqr* by the volumes, the
+        intensity weights and the surfaces for each radius."""
+        radius = radius.astype(numpy.float64, copy = False)
+        vol = (pi*4./3.) * radius * radius * radius
+        v = vol * self.sld()**2
+        exponent = 2 * compensationExponent
+        if exponent == 1.: # volume weighted, c = 1/2
+            w = vol
+        elif exponent == 2.:
+            w = vol * vol
+        else:
+            w = vol**exponent
+        s = 4. * pi * radius * radius
+        return ffSqr, v, w, s
 
 Sphere.factory()
 
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# models/sphere_test.py
+
+import numpy
+from numpy.testing import assert_allclose
+from scipy.special import spherical_jn
+
+from .sphere import sphereFormfactor, Sphere
+from ..dataobj import SASData
+
+def directFormfactor(qr):
+    qr = numpy.asarray(qr, dtype = numpy.float64)
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        result = 3. * (numpy.sin(qr) - qr * numpy.cos(qr)) / qr**3
+    # the direct expression cancels for small qr, use the equivalent
+    # spherical Bessel function 3 j1(qr) / qr there
+    small = (qr < 1.)
+    result[small] = 3. * spherical_jn(1, qr[small]) / qr[small]
+    return result
+
+def checkFormfactor(qr, dtype, atol):
+    qr = numpy.asarray(qr, dtype = dtype)
+    work = numpy.empty_like(qr), numpy.empty_like(qr)
+    result = sphereFormfactor(qr, 1., work = work)
+    assert result.dtype == dtype
+    assert numpy.all(numpy.isfinite(result))
+    # the form factor is 1 at most, it has roots: compare absolutely
+    assert_allclose(result, directFormfactor(qr), rtol = 0, atol = atol)
+
+def testSwitchToSeries():
+    # both sides of the switch to the Taylor series
+    for dtype, switch, atol in ((numpy.float64, 0.1, 1e-13),
+                                (numpy.float32, 0.5, 2e-6)):
+        eps = numpy.finfo(dtype).eps
+        qr = switch * numpy.array((1. - 1e-3, 1. - 4 * eps, 1.,
+                                   1. + 4 * eps, 1. + 1e-3))
+        checkFormfactor(qr, dtype, atol)
+
+def testSingularHalfAngle():
+    # tan(qr/2) is singular at odd multiples of pi
+    qr = (2 * numpy.arange(0, 50) + 1) * numpy.pi
+    qr = numpy.concatenate((qr, numpy.nextafter(qr, 0.),
+                            numpy.nextafter(qr, numpy.inf)))
+    checkFormfactor(qr, numpy.float64, 1e-13)
+    checkFormfactor(qr, numpy.float32, 2e-6)
+
+def testRange():
+    qr = numpy.logspace(-4, 3, 2000)
+    checkFormfactor(qr, numpy.float64, 1e-13)
+    checkFormfactor(qr, numpy.float32, 2e-6)
+
+class GenericSphere(Sphere):
+    """Evaluates each contribution by calcIntensity()."""
+    def calcIntensities(self, *args, **kwargs):
+        return None
+
+def getSmearedData():
+    q = numpy.logspace(-2, 0, 150)
+    data = SASData(title = "test", rawArray = numpy.vstack(
+                    (q, q**-2, q**-2 * 0.01)).T)
+    smearing = data.config.smearing
+    smearing.doSmear.setValue(True)
+    smearing.umbra.setValue(1e7)
+    smearing.penumbra.setValue(5e7)
+    data.locs = data.config.prepareSmearing(data.x0.binnedData)
+    return data
+
+def testSmearedBlocks():
+    data = getSmearedData()
+    model, generic = Sphere(), GenericSphere()
+    assert model.doSmear(data)
+    radii = numpy.random.RandomState(3).uniform(1e-9, 1e-7, size = (40, 1))
+    # a few contributions per block
+    model._batchBytes = 7 * 3 * 8 * data.locs.size
+    for compensationExponent in (0.5, 2./3):
+        intensities = numpy.zeros((len(radii), data.f.binnedData.size))
+        reference = numpy.zeros_like(intensities)
+        result = model.calc(data, radii, compensationExponent,
+                            intensities = intensities)
+        expected = generic.calc(data, radii, compensationExponent,
+                                intensities = reference)
+        assert_allclose(intensities, reference, rtol = 1e-12)
+        assert_allclose(result.cumInt, expected.cumInt, rtol = 1e-12)
+        for attr in ("vset", "wset", "sset"):
+            assert_allclose(getattr(result, attr), getattr(expected, attr),
+                            rtol = 1e-12)
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
@@ -2,10 +2,11 @@
 # models/SphericalCoreShell.py
 
 import numpy, scipy, scipy.special
-from numpy import pi, zeros, sin, cos, sqrt, newaxis, sinc
+from numpy import pi, zeros, sqrt, newaxis, sinc
 
 from mcsas.utils.parameter import FitParameter, Parameter
 from mcsas.bases.model import SASModel
+from mcsas.models.sphere import sphereFormfactor
 from mcsas.bases.algorithm import RandomExponential, RandomUniform
 from mcsas.utils.units import Length, SLD
 
@@ -50,11 +51,7 @@ class SphericalCoreShell(SASModel):
     def formfactor(self, dataset):
         def k(q, r, dEta):
             # modified K, taken out the volume scaling
-            qr = numpy.outer(q, r)
-            k = dEta * 3 * (
-                    sin(qr) - qr * cos(qr)
-                    ) / (qr)**3
-            return k
+            return dEta * sphereFormfactor(q, r)
 
         # dToR = pi / 180. #degrees to radian
 
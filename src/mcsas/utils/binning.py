@@ -17,7 +17,7 @@
 """
 
 from numpy import (zeros, mean, sqrt, std, reshape, size, linspace,
-                   argsort, ones, array, sort, diff)
+                   argsort, array, sort, diff)
 
 def binningArray(q, psi, intensity, error, s = 2):
     """This function applies a simple s-by-s binning routine on images.
@@ -107,41 +107,37 @@ def binning1d(q, intensity, error = None, numBins = 200, stats = 'std'):
                           (q <= (qbinCenters[bini] + stepsize)))
         iToBin = intensity[limMask]
         if size(error) != 0:
-            eToBin = sum(error[limMask])
+            eToBin = error[limMask].sum()
 
-        # find out the weighting factors for each (q, intensity, error)-pair
-        # in the array  
-        weightFactor = ones(size(iToBin))
+        # each (q, intensity, error)-pair in the array is weighted equally,
+        # the sum of their weights is the number of pairs in the bin
+        count = float(size(iToBin))
 
         # sum the intensities in one bin and normalize by number of pixels
-        ibin[bini] = sum(iToBin)/sum(weightFactor)
+        ibin[bini] = iToBin.sum()/count
 
         # now we deal with the Errors:
         if (size(error) != 0):
             # if we have errors supplied from outside
             # standard error calculation:
-            sebin[bini] = (sqrt(sum(eToBin**2 * weightFactor))/
-                            sum(weightFactor))
+            sebin[bini] = sqrt(eToBin**2 * count)/count
             if stats == 'auto':
                 # according to the definition of sample-standard deviation
-                sdbin[bini] = sqrt(sum((
-                                iToBin - ibin[bini])**2 * weightFactor
-                                   )/(sum(weightFactor) - 1))
+                sdbin[bini] = sqrt(((iToBin - ibin[bini])**2).sum()
+                                   /(count - 1))
                 # maximum between standard error and Poisson statistics
                 sebin[bini] = array([
                             sebin[bini],
-                            sdbin[bini] / sqrt(sum(weightFactor))]).max()
+                            sdbin[bini] / sqrt(count)]).max()
         else:           
             # calculate the standard deviation of the intensity in the bin
             # both for samples with supplied error as well as for those where
             # the error is supposed to be calculated
             # according to the definition of sample-standard deviation
-            sdbin[bini] = sqrt(sum(
-                                (iToBin-ibin[bini])**2 * weightFactor
-                                )/(sum(weightFactor) - 1))
+            sdbin[bini] = sqrt(((iToBin-ibin[bini])**2).sum()/(count - 1))
             # calculate standard error by dividing the standard error by the
             # square root of the number of measurements
-            sebin[bini] = sdbin[bini]/sqrt(sum(weightFactor))
+            sebin[bini] = sdbin[bini]/sqrt(count)
 
     return qbinCenters, ibin, sebin
 
@@ -56,10 +56,14 @@ class Moments(object):
         return str(self)
 
     def __init__(self, contribs, paramIndex, valueRange, fraction, algo = None):
-        self._setValidRange(contribs[:, paramIndex, :], valueRange)
-        self._calcMoments(contribs[:, paramIndex, :], fraction)
+        # one contiguous block of the values of this parameter for the
+        # reductions below, instead of strided rows of all parameters
+        paramValues = np.ascontiguousarray(contribs[:, paramIndex, :])
+        self._setValidRange(paramValues, valueRange)
+        self._calcMoments(paramValues, fraction)
         if algo is not None:
-            scalingFactors = algo.result[paramIndex]['scalingFactors']
+            # one result dict for all parameters
+            scalingFactors = algo.result[0]['scalingFactors']
             self._calcPartialIntensities(contribs, scalingFactors, algo)
 
     def _setValidRange(self, contribs, valueRange):
@@ -69,17 +73,13 @@ class Moments(object):
                     <number of contributions x number of repetitions>
         """
         testfor(contribs.ndim == 2, ValueError)
-        numContribs, numReps = contribs.shape
-        self._validRange = np.zeros_like(contribs.T, dtype = bool)
-        for ri in range(numReps):
-            # the single set of R for this calculation
-            rset = contribs[:, ri]
-            self._validRange[ri] = ((rset > min(valueRange))
-                                  * (rset < max(valueRange)))
+        lo, hi = min(valueRange), max(valueRange)
+        # stored per repetition: <number of repetitions x number of contribs>
+        self._validRange = ((contribs > lo) & (contribs < hi)).T
 
     def _calcMoments(self, contribs, fraction):
         """Calculates the moments of the distribution of the current
-        particular (implied) parameter.
+        particular (implied) parameter for all repetitions at once.
 
         - *contribs*: parameter value sets of shape
                       <number of contributions x number of repetitions>
@@ -87,30 +87,32 @@ class Moments(object):
 
         """
         numContribs, numReps = contribs.shape
-        val = np.zeros(numReps)
+        valid = self._validRange.T
+        # fractions outside of the valid range do not contribute
+        frac = np.where(valid, fraction, 0.)
+        val = frac.sum(axis = 0)
+        # repetitions without any fraction in the valid range keep zero
+        # moments, this includes an empty valid range
+        hasFrac = (val != 0.)
         mu  = np.zeros(numReps)
         var = np.zeros(numReps)
         skw = np.zeros(numReps)
         krt = np.zeros(numReps)
-        # loop over each repetition
-        for ri in range(numReps):
-            # the single set of R for this calculation
-            if not any(self._validRange[ri]):
-                continue # what to do if validRange is empty?
-            rset = contribs[self._validRange[ri], ri]
-            frac = fraction[self._validRange[ri], ri]
-            val[ri] = sum(frac)
-            mu[ri]  = sum(rset * frac)
-            if 0 != sum(frac):
-                mu[ri] /= sum(frac)
-            var[ri] = sum( (rset-mu[ri])**2 * frac )/sum(frac)
-            sigma   = np.sqrt(abs(var[ri]))
-            if (sum(frac) * sigma) == 0.0:
-                continue # avoid div0 RuntimeWarnings and NaN values
-            skw[ri] = ( sum( (rset-mu[ri])**3 * frac )
-                     / (sum(frac) * sigma**3))
-            krt[ri] = ( sum( (rset-mu[ri])**4 * frac )
-                     / (sum(frac) * sigma**4))
+        mu[hasFrac] = (np.einsum('ij,ij->j', contribs, frac)[hasFrac]
+                       / val[hasFrac])
+        # central moments about the mean, no cancellation of raw moments
+        dev = contribs - mu
+        wDev = dev * dev * frac
+        m2 = wDev.sum(axis = 0)
+        var[hasFrac] = m2[hasFrac] / val[hasFrac]
+        sigma = np.sqrt(abs(var))
+        # avoid div0 RuntimeWarnings and NaN values
+        isNorm = hasFrac & (val * sigma != 0.0)
+        m3 = np.einsum('ij,ij->j', wDev, dev)
+        m4 = np.einsum('ij,ij,ij->j', wDev, dev, dev)
+        norm = val[isNorm] * sigma[isNorm]**3
+        skw[isNorm] = m3[isNorm] / norm
+        krt[isNorm] = m4[isNorm] / (norm * sigma[isNorm])
 
         DDoF = 0
         if numReps > 1: # prevent division by zero in numpy.std()
@@ -198,6 +200,7 @@ class Histogram(DataSet, DisplayMixin):
 
     # results: class HistogramResult?
     _xLowerEdge = None
+    _xEdgeKey = None # settings the current bin edges were calculated for
     _xMean = None
     _xWidth = None
     _bins = None
@@ -349,6 +352,11 @@ class Histogram(DataSet, DisplayMixin):
     def _setXLowerEdge(self):
         # Now bin whilst keeping track of which contribution ends up in
         # which bin: set bin edge locations
+        # kept as long as the settings they depend on do not change
+        key = (self.lower, self.upper, self.binCount, self.xscale)
+        if self._xLowerEdge is not None and self._xEdgeKey == key:
+            return
+        self._xEdgeKey = key
         if 'lin' in self.xscale:
             # histogramXLowerEdge contains #histogramBins+1 bin edges,
             # or class limits.
@@ -368,11 +376,8 @@ class Histogram(DataSet, DisplayMixin):
     def _setXMean(self):
         if self.xLowerEdge is None:
             return
-        # NOTE: isn't this the same as:
-        # self.xWidth * .5 + self.xLowerEdge
-        self._xMean = np.zeros(self.binCount)
-        for i in range(self.binCount):
-            self._xMean[i] = self.xLowerEdge[i:i+2].mean()
+        # the center between the edges of each bin
+        self._xMean = .5 * (self.xLowerEdge[:-1] + self.xLowerEdge[1:])
 
     @property
     def xWidth(self):
@@ -400,22 +405,39 @@ class Histogram(DataSet, DisplayMixin):
         if allObservability is None:
             return
         testfor(allObservability.shape[0] == self.binCount, ValueError)
-        for bi in range(self.binCount):
-            # for observabilities over all repetitions select the largest
-            obs = allObservability[bi, :]
-            try:
-                self._observability[bi] = obs[obs < np.inf].max()
-            except ValueError: # obs[obs < np.inf] can be empty
-                pass
+        # for observabilities over all repetitions select the largest,
+        # bins without any finite observability remain zero
+        finite = (allObservability < np.inf)
+        largest = np.where(finite, allObservability, -np.inf).max(axis = 1)
+        filled = finite.any(axis = 1)
+        self._observability[filled] = largest[filled]
 
     @property
     def moments(self):
         return self._moments
 
-    def _binMask(self, bini, parValues):
-        # indexing which contributions fall into the radius bin
-        return (  (parValues >= self.xLowerEdge[bini])
-                * (parValues <  self.xLowerEdge[bini + 1]))
+    def _binIndices(self, parValues):
+        """Returns the index of the bin each contribution falls into,
+        *binCount* for those outside of the histogram range."""
+        # bin i covers xLowerEdge[i] <= x < xLowerEdge[i+1]
+        edges = self.xLowerEdge
+        indices = np.empty(len(parValues), dtype = np.intp)
+        indices.fill(self.binCount)
+        inside = (parValues >= edges[0]) & (parValues < edges[-1])
+        values = parValues[inside]
+        # equidistant bins, on a linear or logarithmic scale
+        lower, upper = edges[0], edges[-1]
+        scaled = values
+        if 'lin' not in self.xscale:
+            scaled, lower, upper = (np.log10(values),
+                                    np.log10(lower), np.log10(upper))
+        scaled = (scaled - lower) * (self.binCount / (upper - lower))
+        binIdx = np.clip(scaled.astype(np.intp), 0, self.binCount - 1)
+        # values rounded into a neighbouring bin are moved to their edges
+        binIdx -= (values < edges[binIdx])
+        binIdx += (values >= edges[binIdx + 1])
+        indices[inside] = binIdx
+        return indices
 
     def calc(self, contribs, paramIndex, fractions):
         self._setXLowerEdge()
@@ -423,59 +445,52 @@ class Histogram(DataSet, DisplayMixin):
 
     def _calcRepetitions(self, contribs, paramIndex, fractions):
         numContribs, dummy, numReps = contribs.shape
-        binLst, obsLst, cdfLst = [], [], []
+        binLst, obsLst = [], []
         fractions, minReq = fractions[self.yweight]
+        # values of this parameter, one contiguous row for each repetition
+        repValues = np.ascontiguousarray(contribs[:, paramIndex, :].T)
         for ri in range(numReps):
-            parValues = contribs[:, paramIndex, ri]
-            bins, binObs, cdf = self._calcBins(
+            parValues = repValues[ri]
+            bins, binObs = self._calcBins(
                     contribs, parValues, fractions[:, ri], minReq[:, ri])
             binLst.append(bins)
             obsLst.append(binObs)
-            cdfLst.append(cdf)
+        # y values of all repetitions, empty bins may result in NaN
+        bins = np.nan_to_num(np.vstack(binLst).T, copy = False, nan = 0.,
+                             posinf = np.inf, neginf = -np.inf)
         # set final result: y values, CDF and observability of all bins
-        self._bins = VectorResult(np.vstack(binLst).T)
-        self._cdf = VectorResult(np.vstack(cdfLst).T)
+        self._bins = VectorResult(bins)
+        self._cdf = VectorResult(self._calcCDF(bins))
         self._setObservability(np.vstack(obsLst).T)
         self._moments = Moments(contribs, paramIndex, self.xrange, fractions)
 
     def _calcBins(self, contribs, parValues, fraction, minReq):
-        """Returns np arrays for the bin values, observability and the CDF
-        based on the bin values."""
+        """Returns np arrays for the bin values and observability."""
         # single set of R for this calculation
-        bins = np.zeros(self.binCount)
-        binObs = np.zeros(self.binCount)
-        for bi in range(self.binCount):
-            val, obs = self._calcBin(
-                    self._binMask(bi, parValues),
-                    fraction, minReq)
-            bins[bi] = val
-            binObs[bi] = obs
-            cdf = self._calcCDF(bins)
-        return bins, binObs, cdf
-
-    def _calcBin(self, binMask, fraction, minReq):
-        """
-           *fraction*: overall fraction (number or volume, weighting depending)
-        """
-        # y contains the volume fraction for that radius bin
-        binValue = sum(fraction[binMask])
-        if np.isnan(binValue):
-            binValue = 0.
-        # observability below
-        if not any(binMask):
-            binMinReq = 0.
-        else:
-            binMinReq = minReq[binMask].mean()
-        return binValue, binMinReq
+        indices = self._binIndices(parValues)
+        # one more bin collecting the contributions out of range
+        length = self.binCount + 1
+        # bins contain the fraction (number or volume, weighting depending)
+        # of the contributions in each bin
+        bins = np.bincount(indices, weights = fraction,
+                           minlength = length)[:-1]
+        # observability: mean minimum required fraction in each bin
+        counts = np.bincount(indices, minlength = length)[:-1]
+        binObs = np.bincount(indices, weights = minReq,
+                             minlength = length)[:-1]
+        filled = (counts > 0)
+        binObs[filled] /= counts[filled]
+        binObs[~filled] = 0.
+        return bins, binObs
 
     def _calcCDF(self, bins):
-        cdf = np.zeros_like(bins)
-        cdf[0] = bins[0]
-        for i in range(1, len(cdf)):
-            cdf[i] = cdf[i - 1] + bins[i]
-        if cdf.max() == 0.0:
-            return np.zeros_like(bins)
-        cdf /= cdf.max() # normalized to max == 1
+        """Returns the CDF of each column of bin values, normalized to a
+        maximum of 1. Columns without any content remain zero."""
+        cdf = np.cumsum(bins, axis = 0)
+        cdfMax = cdf.max(axis = 0)
+        empty = (cdfMax == 0.0)
+        cdf[:, empty] = 0.
+        cdf[:, ~empty] /= cdfMax[~empty] # normalized to max == 1
         return cdf
 
     def __str__(self):
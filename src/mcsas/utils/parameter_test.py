@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# utils/parameter_test.py
+
+import numpy
+from numpy.testing import assert_allclose, assert_array_equal
+
+from .parameter import Moments, Histogram
+from ..models.sphere import Sphere
+
+def directMoments(values, fraction, valueRange):
+    """Central moments of each repetition, computed one by one."""
+    numReps = values.shape[1]
+    result = numpy.zeros((5, numReps))
+    for ri in range(numReps):
+        valid = (values[:, ri] > min(valueRange)) & (values[:, ri] < max(valueRange))
+        x, w = values[valid, ri], fraction[valid, ri]
+        total = w.sum()
+        if total == 0.:
+            continue # zero moments without any fraction
+        mean = (x * w).sum() / total
+        var = ((x - mean)**2 * w).sum() / total
+        result[:3, ri] = total, mean, var
+        if var == 0.:
+            continue
+        sigma = numpy.sqrt(var)
+        result[3, ri] = ((x - mean)**3 * w).sum() / (total * sigma**3)
+        result[4, ri] = ((x - mean)**4 * w).sum() / (total * sigma**4)
+    return result
+
+def testMoments():
+    rng = numpy.random.RandomState(7)
+    numContribs, numReps = 200, 6
+    valueRange = (1e-9, 1e-6)
+    # narrow distributions far from the first contribution of each
+    # repetition, some values outside of the valid range
+    values = 1e-7 * (1. + 1e-3 * rng.standard_normal((numContribs, numReps)))
+    values[0] = 9e-7
+    values[1:10] = 2e-6
+    fraction = rng.uniform(size = (numContribs, numReps))
+    fraction[0] = 1e-9
+    fraction[:, 2] = 0. # a repetition without any fraction
+    # two parameters, the other one must not interfere
+    contribs = numpy.stack((rng.uniform(size = values.shape), values), axis = 1)
+    moments = Moments(contribs, 1, valueRange, fraction)
+
+    expected = directMoments(values, fraction, valueRange)
+    assert numpy.all(expected[:, 2] == 0.)
+    fields = (moments.total, moments.mean, moments.variance,
+              moments.skew, moments.kurtosis)
+    for field, exp in zip(fields, expected):
+        assert numpy.all(numpy.isfinite(field))
+        assert_allclose(field, (exp.mean(), exp.std(ddof = 1)),
+                        rtol = 1e-8, atol = 0)
+
+def getHistogram(xscale, binCount = 20):
+    hist = Histogram(Sphere().radius, 1e-9, 1e-6, binCount, xscale, "vol")
+    hist._setXLowerEdge()
+    return hist
+
+def directBinIndices(edges, values):
+    """Index i of the bin edges[i] <= x < edges[i+1] for each value,
+    the number of bins for values outside."""
+    indices = numpy.empty(len(values), dtype = int)
+    indices.fill(len(edges) - 1)
+    for vi, x in enumerate(values):
+        for i in range(len(edges) - 1):
+            if edges[i] <= x < edges[i + 1]:
+                indices[vi] = i
+    return indices
+
+def testBinIndices():
+    rng = numpy.random.RandomState(3)
+    for xscale in Histogram.xscaling():
+        hist = getHistogram(xscale)
+        edges = hist.xLowerEdge
+        values = numpy.concatenate((
+            # exactly on the edges and one ulp either side of them
+            edges, numpy.nextafter(edges, 0.), numpy.nextafter(edges, 1.),
+            # outside of the range
+            (0., edges[0] / 2., edges[-1] * 2., -1.),
+            rng.uniform(edges[0], edges[-1], 500)))
+        assert_array_equal(hist._binIndices(values),
+                           directBinIndices(edges, values))
+
+def directBins(edges, values, fraction, minReq):
+    """Sum of fractions and mean minimum required fraction in each bin,
+    by a mask for each bin."""
+    binCount = len(edges) - 1
+    bins, binObs = numpy.zeros(binCount), numpy.zeros(binCount)
+    for i in range(binCount):
+        mask = (values >= edges[i]) & (values < edges[i + 1])
+        bins[i] = fraction[mask].sum()
+        if mask.any():
+            binObs[i] = minReq[mask].mean()
+    return bins, binObs
+
+def testCalcBins():
+    rng = numpy.random.RandomState(5)
+    numContribs, numReps = 100, 4
+    for xscale in Histogram.xscaling():
+        hist = getHistogram(xscale)
+        edges = hist.xLowerEdge
+        # concentrated in the lower half of the range: empty upper bins,
+        # some values outside
+        values = rng.uniform(edges[0] / 2., edges[len(edges) // 2],
+                             (numContribs, numReps))
+        fraction = rng.uniform(size = values.shape)
+        minReq = rng.uniform(size = values.shape)
+        fraction[5, 1] = numpy.nan # a NaN fraction spoils its bin
+        contribs = values[:, numpy.newaxis, :]
+        for ri in range(numReps):
+            bins, binObs = hist._calcBins(contribs, values[:, ri],
+                                          fraction[:, ri], minReq[:, ri])
+            binsRef, binObsRef = directBins(edges, values[:, ri],
+                                            fraction[:, ri], minReq[:, ri])
+            assert (binsRef == 0.).any()
+            assert_allclose(bins, binsRef, rtol = 1e-12)
+            assert_allclose(binObs, binObsRef, rtol = 1e-12)
+        # all repetitions: the NaN bin counts as empty
+        hist.calc(contribs, 0, dict(vol = (fraction, minReq)))
+        binsRef = numpy.vstack([directBins(edges, values[:, ri],
+                                           fraction[:, ri], minReq[:, ri])[0]
+                                for ri in range(numReps)]).T
+        assert numpy.isnan(binsRef).sum() == 1
+        binsRef = numpy.nan_to_num(binsRef)
+        assert_allclose(hist.bins.full, binsRef, rtol = 1e-12)
+        assert_allclose(hist.bins.mean, binsRef.mean(axis = 1), rtol = 1e-12)
+
+# vim: set ts=4 sts=4 sw=4 tw=0:
@@ -9,14 +9,20 @@ class PropertyNames(object):
     @classmethod
     def properties(cls):
         """Returns all attributes configured in this class."""
-        nameList = dir(cls)
-        hashValue = hash(repr(nameList))
-        if not cls._cache or cls._cache[0] != hashValue:
-            result = [(name, getattr(cls, name)) for name in nameList
-                      if not name.startswith("_") and
-                      not inspect.ismethod(getattr(cls, name))]
-            cls._cache = hashValue, result
-        return cls._cache[1]
+        # cheap validity check of the cache: the namespace sizes of the
+        # class hierarchy change only if attributes are added or removed
+        key = tuple(len(vars(c)) for c in cls.__mro__)
+        if (not cls._cache or cls._cache[0] is not cls
+                or cls._cache[1] != key):
+            result = []
+            for name in dir(cls):
+                if name.startswith("_"):
+                    continue
+                value = getattr(cls, name)
+                if not inspect.ismethod(value):
+                    result.append((name, value))
+            cls._cache = cls, key, result
+        return cls._cache[2]
 
     @classmethod
     def propNames(cls):